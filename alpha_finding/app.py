@@ -1,19 +1,30 @@
 # app.py
-from flask import Flask, jsonify, request
+import json
+from flask import Flask, Response, jsonify, request, stream_with_context
 import pandas as pd  # Example: external lib
 import initial_stock_list
 import momentum_stocks
+import screens
+from jobs import JobManager
 
 app = Flask(__name__)
+jobs = JobManager()
+
+def stocks_summary(stock_count):
+    data = initial_stock_list.get_initial_stock_list(stock_count)
+    return data.to_dict()
+
+def momentum_summary(stocks):
+    momentum_list = momentum_stocks.run_momentum_stocks(stocks)
+    summary = pd.DataFrame(momentum_list)
+    return summary.to_dict(orient='records')
 
 @app.route('/get_stocks', methods=['POST'])
 def process():
     try:
         req_data = request.get_json()
         stock_count = req_data.get('stock_count',15)
-        data = initial_stock_list.get_initial_stock_list(stock_count)
-        summary = data.to_dict()
-        return jsonify(summary)
+        return jsonify(stocks_summary(stock_count))
     except Exception as e:
         return jsonify({'error': str(e)}), 500
     
@@ -21,11 +32,81 @@ def process():
 def get_momentum_stocks():
     try:
         req_data = request.get_json()
-        initial_stock_list = req_data[0]['stocks']
-        momentum_list = momentum_stocks.run_momentum_stocks(initial_stock_list)
-        summary = pd.DataFrame(momentum_list)
-        summary = summary.to_dict(orient='records')
-        return jsonify(summary)
+        stocks = req_data[0]['stocks']
+        return jsonify(momentum_summary(stocks))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+# === ASYNC JOBS ===
+# Same request bodies as the synchronous endpoints; they return a job id to poll instead.
+@app.route('/jobs/get_stocks', methods=['POST'])
+def submit_get_stocks():
+    try:
+        req_data = request.get_json()
+        stock_count = req_data.get('stock_count',15)
+        job_id = jobs.submit('get_stocks', stocks_summary, stock_count)
+        return jsonify(jobs.status(job_id)), 202
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/jobs/get_momentum_stocks', methods=['POST'])
+def submit_get_momentum_stocks():
+    try:
+        req_data = request.get_json()
+        stocks = req_data[0]['stocks']
+        job_id = jobs.submit('get_momentum_stocks', momentum_summary, stocks)
+        return jsonify(jobs.status(job_id)), 202
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    status = jobs.status(job_id)
+    if status is None:
+        return jsonify({'error': 'Unknown or expired job id'}), 404
+    return jsonify(status)
+
+@app.route('/jobs/<job_id>/result', methods=['GET'])
+def job_result(job_id):
+    job = jobs.result(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown or expired job id'}), 404
+    if job['status'] == 'failed':
+        return jsonify({'error': job['error']}), 500
+    if job['status'] != 'done':
+        return jsonify(jobs.status(job_id)), 202
+    return jsonify(job['result'])
+
+@app.route('/stream_momentum_stocks', methods=['POST'])
+def stream_momentum_stocks():
+    """
+    Same body as /get_momentum_stocks; streams NDJSON records as tickers are screened.
+    """
+    try:
+        req_data = request.get_json()
+        stocks = req_data[0]['stocks']
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
+    def generate():
+        try:
+            for record in momentum_stocks.iter_momentum_stocks(stocks):
+                yield json.dumps(record) + "\n"
+        except Exception as e:
+            yield json.dumps({'type': 'error', 'error': str(e)}) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/run_screens', methods=['POST'])
+def run_screens():
+    try:
+        req_data = request.get_json()
+        stocks = req_data['stocks']
+        definitions = req_data.get('screens') # defaults to screens.json
+        results = screens.run_screens(stocks, definitions)
+        return jsonify(results)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
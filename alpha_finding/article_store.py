@@ -0,0 +1,128 @@
+import hashlib
+import sqlite3
+import time
+from collections import OrderedDict
+
+# === CONFIGURATION ===
+DB_FILE = "seen_articles.db"
+FRONT_CACHE_SIZE = 50_000  # (symbol, article) keys kept in memory
+RETENTION = 30 * 24 * 60 * 60  # seconds an article key is remembered after it was last in a fetched batch
+TOUCH_INTERVAL = 24 * 60 * 60  # seconds between seen_at refreshes of an article still in the feed
+
+
+def article_key(*parts):
+    """
+    Short stable hash of whatever identifies an article (id, url, headline + time).
+    """
+    return hashlib.sha1("|".join(str(p) for p in parts).encode()).hexdigest()[:20]
+
+
+class ArticleStore:
+    """
+    Durable record of alerted articles: SQLite keyed by (symbol, article key), with a bounded
+    LRU front cache so repeated lookups of recent articles never touch the database.
+    seen_at is refreshed while an article is still returned by the source, so prune() only
+    forgets articles that have dropped out of the feed and can no longer be re-alerted.
+    """
+
+    def __init__(self, path=DB_FILE, front_cache_size=FRONT_CACHE_SIZE):
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS seen_articles ("
+            " symbol TEXT NOT NULL, article_key TEXT NOT NULL, published INTEGER, seen_at INTEGER NOT NULL,"
+            " PRIMARY KEY (symbol, article_key)) WITHOUT ROWID"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS idx_seen_at ON seen_articles (seen_at)")
+        # Symbols ever baselined; never pruned, so a symbol whose articles all aged out is not new again
+        self.db.execute("CREATE TABLE IF NOT EXISTS known_symbols (symbol TEXT PRIMARY KEY, first_seen INTEGER NOT NULL)")
+        self.db.execute("INSERT OR IGNORE INTO known_symbols SELECT symbol, MIN(seen_at) FROM seen_articles GROUP BY symbol")
+        self.db.commit()
+        self.front = OrderedDict()  # (symbol, key) -> seen_at as last written
+        self.front_cache_size = front_cache_size
+        self.known_symbols = set()
+
+    def remember(self, key, seen_at):
+        self.front[key] = seen_at
+        self.front.move_to_end(key)
+        while len(self.front) > self.front_cache_size:
+            self.front.popitem(last=False)
+
+    def seen_at(self, symbol, key):
+        """
+        When the article was last recorded as in the feed, or None if it was never seen.
+        """
+        if (symbol, key) in self.front:
+            self.front.move_to_end((symbol, key))
+            return self.front[(symbol, key)]
+        row = self.db.execute(
+            "SELECT seen_at FROM seen_articles WHERE symbol = ? AND article_key = ?", (symbol, key)
+        ).fetchone()
+        if row:
+            self.remember((symbol, key), row[0])
+        return row[0] if row else None
+
+    def is_seen(self, symbol, key):
+        return self.seen_at(symbol, key) is not None
+
+    def has_symbol(self, symbol):
+        if symbol in self.known_symbols:
+            return True
+        row = self.db.execute("SELECT 1 FROM known_symbols WHERE symbol = ?", (symbol,)).fetchone()
+        if row:
+            self.known_symbols.add(symbol)
+        return row is not None
+
+    def touch(self, symbol, keys):
+        """
+        Refreshes seen_at of articles still in the feed (at most once per TOUCH_INTERVAL each).
+        """
+        now = int(time.time())
+        rows = [(now, symbol, key) for key in keys]
+        self.db.executemany("UPDATE seen_articles SET seen_at = ? WHERE symbol = ? AND article_key = ?", rows)
+        self.db.commit()
+        for key in keys:
+            self.remember((symbol, key), now)
+
+    def mark_seen(self, symbol, items):
+        """
+        items: iterable of (article key, published timestamp).
+        """
+        now = int(time.time())
+        rows = [(symbol, key, published, now) for key, published in items]
+        self.db.executemany("INSERT OR IGNORE INTO seen_articles VALUES (?, ?, ?, ?)", rows)
+        self.db.execute("INSERT OR IGNORE INTO known_symbols VALUES (?, ?)", (symbol, now))
+        self.db.commit()
+        for _, key, _, _ in rows:
+            self.remember((symbol, key), now)
+        self.known_symbols.add(symbol)
+
+    def new_articles(self, symbol, articles, key_fn, time_fn):
+        """
+        Diffs a fetched batch against the store and returns the unseen articles, oldest first,
+        as (key, published, article) tuples.
+        The first batch ever seen for a symbol is recorded as a baseline and only its newest
+        article is returned, so a new watchlist entry does not flood the chat with history.
+        """
+        batch = {}
+        for article in articles:
+            batch.setdefault(key_fn(article), article)
+        now = time.time()
+        unseen, stale = [], []
+        for key, article in batch.items():
+            seen_at = self.seen_at(symbol, key)
+            if seen_at is None:
+                unseen.append((key, time_fn(article), article))
+            elif now - seen_at > TOUCH_INTERVAL:
+                stale.append(key)
+        if stale:
+            self.touch(symbol, stale)
+        unseen.sort(key=lambda item: item[1])
+        if unseen and not self.has_symbol(symbol):
+            self.mark_seen(symbol, [(key, published) for key, published, _ in unseen[:-1]])
+            unseen = unseen[-1:]
+        return unseen
+
+    def prune(self, retention=RETENTION):
+        self.db.execute("DELETE FROM seen_articles WHERE seen_at < ?", (int(time.time() - retention),))
+        self.db.commit()
@@ -0,0 +1,115 @@
+import time
+import numpy as np
+import pandas as pd
+from momentum_stocks import (
+    download_in_chunks, ema_panel, rsi_panel, sma_panel,
+    EMA_SPANS, RSI_WINDOW, ROC_PERIOD, VOLUME_SMA_WINDOW
+)
+
+# === CONFIGURATION ===
+TICKERS_CSV = "initial_stock_list_500.csv" # written by initial_stock_list.get_initial_stock_list
+PERIOD = '10y'
+INTERVAL = '1d'
+TOP_PERCENTILE = 0.01
+HORIZONS = (1, 5, 10, 20) # forward return horizons in bars
+MAX_FILL = 5 # bars a missing close is carried forward (halts), not beyond (delistings)
+
+
+def screen_mask(close, volume):
+    """
+    Evaluates the process_stocks screening conditions on every date at once.
+    Returns (passed, roc) as dates x tickers arrays.
+    """
+    ema = {span: ema_panel(close, span) for span in EMA_SPANS}
+    rsi = rsi_panel(close, RSI_WINDOW)
+    roc = np.full_like(close, np.nan)
+    roc[ROC_PERIOD:] = close[ROC_PERIOD:] / close[:-ROC_PERIOD] - 1
+    volume_sma = sma_panel(volume, VOLUME_SMA_WINDOW)
+
+    complete = ~(np.isnan(ema[50]) | np.isnan(rsi) | np.isnan(roc) | np.isnan(volume_sma))
+    # process_stocks needs at least two complete rows before it screens the latest one
+    enough = np.cumsum(complete, axis=0) >= 2
+
+    with np.errstate(invalid='ignore'):
+        passed = (
+            (rsi > 70)
+            & (close > ema[10])
+            & (ema[5] > ema[10]) & (ema[10] > ema[20])
+            & (close > ema[50])
+            & (volume > 1.2 * volume_sma)
+        )
+    return passed & complete & enough, roc
+
+
+def top_picks_mask(passed, roc, universe_size, top_percentile):
+    """
+    Per-date version of get_confirmed_list: the top max(1, int(universe * top_percentile))
+    passing tickers by 5D ROC.
+    """
+    top_n = np.maximum(1, (universe_size * top_percentile).astype(int))
+    score = np.where(passed, roc, -np.inf)
+    order = np.argsort(-score, axis=1, kind='stable')
+    ranks = np.argsort(order, axis=1)
+    return passed & (ranks < top_n[:, None])
+
+
+def run_backtest(close, volume, horizons=HORIZONS, top_percentile=TOP_PERCENTILE):
+    """
+    Backtests the momentum screen on a dates x tickers panel of closes and volumes.
+    Returns (summary, picks): summary has one row per horizon with the number of signals,
+    mean forward return and hit rate for all screen passes, the top picks and the whole
+    universe; picks lists every (Date, Ticker) top pick with its forward returns.
+    """
+    started = time.time()
+    dates = close.index
+    tickers = close.columns
+    observed = close.notna().to_numpy()
+    close_values = close.ffill(limit=MAX_FILL).to_numpy(dtype=float)
+    volume_values = volume.reindex_like(close).to_numpy(dtype=float, copy=True) # missing stays NaN, as in process_stocks
+    volume_values[np.isnan(close_values)] = np.nan
+
+    passed, roc = screen_mask(close_values, volume_values)
+    passed &= observed
+    universe_size = observed.sum(axis=1)
+    picks = top_picks_mask(passed, roc, universe_size, top_percentile)
+
+    rows = []
+    forward = {}
+    for h in horizons:
+        fwd = np.full_like(close_values, np.nan)
+        fwd[:-h] = close_values[h:] / close_values[:-h] - 1
+        fwd[~observed] = np.nan
+        forward[h] = fwd
+        row = {'Horizon': h}
+        for name, mask in (('Screen', passed), ('Top', picks), ('Universe', observed)):
+            values = fwd[mask & ~np.isnan(fwd)]
+            row[f'{name} Signals'] = int(values.size)
+            row[f'{name} Mean Return (%)'] = round(values.mean() * 100, 3) if values.size else np.nan
+            row[f'{name} Hit Rate'] = round((values > 0).mean(), 3) if values.size else np.nan
+        rows.append(row)
+    summary = pd.DataFrame(rows).set_index('Horizon')
+
+    date_idx, ticker_idx = np.nonzero(picks)
+    picks_df = pd.DataFrame({
+        'Date': dates[date_idx],
+        'Ticker': tickers[ticker_idx],
+        '5D ROC (%)': np.round(roc[date_idx, ticker_idx] * 100, 2),
+    })
+    picks_df = picks_df.sort_values(['Date', '5D ROC (%)'], ascending=[True, False], kind='stable')
+    for h in horizons:
+        picks_df[f'Fwd {h}D (%)'] = np.round(forward[h][date_idx, ticker_idx] * 100, 2)[picks_df.index]
+    picks_df = picks_df.reset_index(drop=True)
+
+    print(f"Backtested {len(tickers)} tickers x {len(dates)} dates in {time.time() - started:.2f}s: "
+          f"{int(passed.sum())} screen passes, {len(picks_df)} top picks.")
+    return summary, picks_df
+
+
+if __name__ == "__main__":
+    tickers = pd.read_csv(TICKERS_CSV)['Symbol'].tolist()
+    frames, _ = download_in_chunks(tickers, period=PERIOD, interval=INTERVAL)
+    close = pd.concat({t: df['Close'] for t, df in frames.items()}, axis=1)
+    volume = pd.concat({t: df['Volume'] for t, df in frames.items()}, axis=1)
+    summary, picks = run_backtest(close, volume)
+    print(summary.to_string())
+    print(picks.tail(20).to_string(index=False))
@@ -0,0 +1,55 @@
+#Benchmark: concurrent, rate limited market cap lookups vs the previous serial loop, on a stubbed source
+
+import sys
+import time
+import numpy as np
+from initial_stock_list import get_market_caps
+
+
+def stub_fetcher(latency, fail_every=10):
+    """
+    Stand-in for fetch_market_cap: sleeps `latency` seconds per call, and every
+    `fail_every`-th symbol raises like an unknown ticker does.
+    """
+    def fetch(symbol):
+        time.sleep(latency)
+        i = int(symbol[3:])
+        if i % fail_every == 0:
+            raise KeyError('marketCap')
+        return float(i * 1_000_000)
+    return fetch
+
+
+def serial_market_caps(symbols, fetcher):
+    """
+    The previous loop in get_initial_stock_list: one lookup after another, failures become None.
+    """
+    market_caps = []
+    for symbol in symbols:
+        try:
+            market_caps.append(fetcher(symbol))
+        except Exception:
+            market_caps.append(None)
+    return market_caps
+
+
+if __name__ == "__main__":
+    # python bench_market_caps.py [symbols] [latency seconds]
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.3
+    symbols = [f"SYM{i}" for i in range(n)]
+    fetcher = stub_fetcher(latency)
+
+    started = time.perf_counter()
+    serial = serial_market_caps(symbols, fetcher)
+    serial_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    concurrent = get_market_caps(symbols, fetcher=fetcher)
+    concurrent_seconds = time.perf_counter() - started
+
+    expected = np.array([np.nan if v is None else v for v in serial], dtype=float)
+    assert np.array_equal(expected, concurrent, equal_nan=True), "results differ"
+    print(f"{n} symbols at {latency * 1000:.0f}ms latency: serial {serial_seconds:.1f}s, "
+          f"concurrent {concurrent_seconds:.1f}s ({serial_seconds / concurrent_seconds:.1f}x), "
+          f"{int(np.isnan(concurrent).sum())} failed lookups in both")
@@ -0,0 +1,140 @@
+import json
+import math
+import os
+import tempfile
+
+# === CONFIGURATION ===
+STATE_FILE = "indicator_state.json"
+EMA_SPANS = (5, 10, 20, 50)
+RSI_WINDOW = 3
+ROC_PERIOD = 5
+VOLUME_SMA_WINDOW = 50
+
+
+class IndicatorState:
+    """
+    Streaming version of the momentum indicators for one ticker: EMA_5/10/20/50 (adjust=False),
+    ta RSI(3), ROC(5) and the 50-bar volume SMA. Each new bar is an O(1) update.
+    Bars with a missing Close or Volume are skipped.
+    """
+    __slots__ = ('last_date', 'last_close', 'bars', 'emas', 'ema_up', 'ema_down',
+                 'closes', 'volumes', 'volume_sum', 'pos')
+
+    def __init__(self):
+        self.last_date = None
+        self.last_close = None
+        self.bars = 0
+        self.emas = [math.nan] * len(EMA_SPANS)
+        self.ema_up = 0.0
+        self.ema_down = 0.0
+        self.closes = [math.nan] * ROC_PERIOD # ring buffer of the previous closes
+        self.volumes = [math.nan] * VOLUME_SMA_WINDOW # ring buffer of the previous volumes
+        self.volume_sum = 0.0
+        self.pos = 0
+
+    @classmethod
+    def seed(cls, df):
+        """
+        Cold start: builds the state by replaying a ticker's full history.
+        """
+        state = cls()
+        for date, close, volume in zip(df.index, df['Close'], df['Volume']):
+            state.update(date, close, volume)
+        return state
+
+    def _next(self, close, volume):
+        """
+        Computes the values after one more bar without changing the state.
+        """
+        if self.bars == 0:
+            emas = [close] * len(EMA_SPANS)
+            ema_up = ema_down = 0.0
+        else:
+            emas = [(1 - 2 / (span + 1)) * ema + 2 / (span + 1) * close
+                    for ema, span in zip(self.emas, EMA_SPANS)]
+            diff = close - self.last_close
+            alpha = 1 / RSI_WINDOW
+            ema_up = (1 - alpha) * self.ema_up + alpha * max(diff, 0.0)
+            ema_down = (1 - alpha) * self.ema_down + alpha * max(-diff, 0.0)
+        bars = self.bars + 1
+        volume_sum = self.volume_sum + volume
+        dropped = self.volumes[self.pos % VOLUME_SMA_WINDOW]
+        if bars > VOLUME_SMA_WINDOW:
+            volume_sum -= dropped
+        return emas, ema_up, ema_down, bars, volume_sum
+
+    def update(self, date, close, volume):
+        """
+        Advances the state by one completed bar.
+        """
+        close, volume = float(close), float(volume)
+        if math.isnan(close) or math.isnan(volume):
+            return
+        self.emas, self.ema_up, self.ema_down, self.bars, self.volume_sum = self._next(close, volume)
+        self.closes[self.pos % ROC_PERIOD] = close
+        self.volumes[self.pos % VOLUME_SMA_WINDOW] = volume
+        self.pos = (self.pos + 1) % (ROC_PERIOD * VOLUME_SMA_WINDOW)
+        if self.pos % VOLUME_SMA_WINDOW == 0 and self.bars >= VOLUME_SMA_WINDOW:
+            # Re-sum once per window so the running sum cannot drift.
+            self.volume_sum = math.fsum(self.volumes)
+        self.last_close = close
+        self.last_date = str(date)
+
+    def latest(self, close, volume):
+        """
+        Indicator row for a (possibly partial) bar on top of the state, without committing it.
+        Same keys as the DataFrame columns in process_stocks; NaN where not yet defined.
+        """
+        close, volume = float(close), float(volume)
+        emas, ema_up, ema_down, bars, volume_sum = self._next(close, volume)
+        if bars < RSI_WINDOW:
+            rsi = math.nan
+        elif ema_down == 0:
+            rsi = 100
+        else:
+            rsi = 100 - (100 / (1 + ema_up / ema_down))
+        roc = math.nan
+        if bars > ROC_PERIOD:
+            roc = close / self.closes[self.pos % ROC_PERIOD] - 1
+        volume_sma = volume_sum / VOLUME_SMA_WINDOW if bars >= VOLUME_SMA_WINDOW else math.nan
+        row = {'Close': close, 'Volume': volume, 'RSI_3': rsi, 'ROC_5': roc, 'Volume_SMA_50': volume_sma}
+        row.update({f'EMA_{span}': ema for span, ema in zip(EMA_SPANS, emas)})
+        return row
+
+    def complete_bars(self, extra=0):
+        """
+        Number of bars with every indicator defined (the rows process_stocks keeps after dropna).
+        """
+        return max(0, self.bars + extra - VOLUME_SMA_WINDOW + 1)
+
+    def to_dict(self):
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data):
+        state = cls()
+        for slot in cls.__slots__:
+            setattr(state, slot, data[slot])
+        return state
+
+
+def load_states(path=STATE_FILE):
+    """
+    Loads persisted states as {ticker: IndicatorState}; an unreadable file means a cold start.
+    """
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path) as f:
+            raw = json.load(f)
+        return {ticker: IndicatorState.from_dict(data) for ticker, data in raw.items()}
+    except Exception as e:
+        print(f"Could not load indicator state from {path}, starting cold: {e}")
+        return {}
+
+
+def save_states(states, path=STATE_FILE):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump({ticker: state.to_dict() for ticker, state in states.items()}, f)
+    os.replace(tmp, path)
@@ -1,38 +1,189 @@
+import io
+import json
+import os
+import threading
+import time
+import numpy as np
 import pandas as pd
+import requests
 import yfinance as yf
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from tqdm import tqdm
+from ttl_cache import TTLCache
+
+# === SYMBOL DIRECTORY CACHE CONFIG ===
+SYMBOL_DIR_URL = "https://www.nasdaqtrader.com/dynamic/SymDir/nasdaqlisted.txt"
+SYMBOL_DIR_FILE = "nasdaqlisted.parquet"
+SYMBOL_DIR_META = "nasdaqlisted.meta.json" # fetch time and HTTP validators for conditional GETs
+SYMBOL_DIR_TTL = 12 * 60 * 60 # seconds; nasdaqtrader regenerates the file daily
+
+# === MARKET CAP ENRICHMENT CONFIG ===
+MAX_WORKERS = 16 # concurrent market cap lookups
+REQUESTS_PER_SECOND = 20 # token bucket refill rate shared by all workers
+BURST = 20 # token bucket capacity
+FAST_INFO = True # fetch only marketCap via fast_info instead of the full info payload
+MARKET_CAP_TTL = 24 * 60 * 60 # seconds
+MARKET_CAP_MAX_ENTRIES = 20000
+MARKET_CAP_FILE = "market_caps.json"
+
+symbol_directory = {'df': None, 'meta': {}}
+symbol_directory_lock = threading.Lock()
+market_cap_cache = TTLCache(MARKET_CAP_TTL, MARKET_CAP_MAX_ENTRIES, MARKET_CAP_FILE)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: acquire() blocks until a token is available.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def fetch_market_cap(symbol):
+    """
+    Market cap for one symbol, or None. fast_info computes it from shares and last price
+    without downloading the full quoteSummary payload that .info pulls.
+    """
+    stock = yf.Ticker(symbol)
+    if FAST_INFO:
+        return stock.fast_info['marketCap']
+    return stock.info.get('marketCap')
+
+
+def get_market_caps(symbols, fetcher=fetch_market_cap, max_workers=MAX_WORKERS,
+                    rate=REQUESTS_PER_SECOND, burst=BURST):
+    """
+    Looks up market caps concurrently behind a shared token bucket.
+    Returns a float array aligned with symbols; failed lookups are NaN.
+    """
+    symbols = list(symbols)
+    market_caps = np.full(len(symbols), np.nan)
+    bucket = TokenBucket(rate, burst)
+
+    def lookup(symbol):
+        bucket.acquire()
+        return fetcher(symbol)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(lookup, symbol): i for i, symbol in enumerate(symbols)}
+        for future in tqdm(as_completed(futures), total=len(futures)):
+            try:
+                value = future.result()
+                if value is not None:
+                    market_caps[futures[future]] = value
+            except Exception:
+                pass
+
+    return market_caps
 
-def get_initial_stock_list(no_of_tickers : int):
 
-    # Step 1: Load NASDAQ-listed companies
-    url = "https://www.nasdaqtrader.com/dynamic/SymDir/nasdaqlisted.txt"
-    df = pd.read_csv(url, sep="|")
+def get_cached_market_caps(symbols):
+    """
+    Market caps from the TTL cache; only missing or expired symbols are looked up.
+    """
+    symbols = list(symbols)
+    market_caps = np.array([market_cap_cache.get(symbol, np.nan) for symbol in symbols], dtype=float)
+    missing = np.flatnonzero(np.isnan(market_caps))
+    print(f"Market caps: {len(symbols) - len(missing)} cached, {len(missing)} to fetch.")
+    if len(missing):
+        fetched = get_market_caps([symbols[i] for i in missing])
+        market_caps[missing] = fetched
+        for i, value in zip(missing, fetched):
+            if not np.isnan(value):
+                market_cap_cache.set(symbols[i], float(value))
+        market_cap_cache.save()
+    return market_caps
 
+
+def download_symbol_directory(meta):
+    """
+    Conditional GET of nasdaqlisted.txt. Returns (cleaned DataFrame or None if unchanged, meta).
+    """
+    headers = {}
+    if meta.get('etag'):
+        headers['If-None-Match'] = meta['etag']
+    if meta.get('last_modified'):
+        headers['If-Modified-Since'] = meta['last_modified']
+    response = requests.get(SYMBOL_DIR_URL, headers=headers, timeout=30)
+    new_meta = {
+        'fetched_at': time.time(),
+        'etag': response.headers.get('ETag', meta.get('etag')),
+        'last_modified': response.headers.get('Last-Modified', meta.get('last_modified')),
+    }
+    if response.status_code == 304:
+        return None, new_meta
+    response.raise_for_status()
+
+    df = pd.read_csv(io.StringIO(response.text), sep="|")
     # Clean the data
     df = df[df['Symbol'] != 'File Creation Time:']
     df = df[df['Test Issue'] == 'N']
+    return df[['Symbol', 'Security Name']], new_meta
+
+
+def get_symbol_directory():
+    """
+    NASDAQ-listed symbols, served from memory, then disk, then the network once the TTL expires.
+    A failed refresh falls back to the last stored copy.
+    """
+    with symbol_directory_lock:
+        meta = symbol_directory['meta']
+        if symbol_directory['df'] is None and os.path.exists(SYMBOL_DIR_FILE) and os.path.exists(SYMBOL_DIR_META):
+            symbol_directory['df'] = pd.read_parquet(SYMBOL_DIR_FILE)
+            with open(SYMBOL_DIR_META) as f:
+                meta = symbol_directory['meta'] = json.load(f)
+
+        if symbol_directory['df'] is not None and time.time() - meta.get('fetched_at', 0) < SYMBOL_DIR_TTL:
+            return symbol_directory['df']
+
+        try:
+            df, meta = download_symbol_directory(meta if symbol_directory['df'] is not None else {})
+        except Exception as e:
+            if symbol_directory['df'] is None:
+                raise
+            print(f"Symbol directory refresh failed, using cached copy: {e}")
+            return symbol_directory['df']
+
+        if df is not None:
+            df.to_parquet(SYMBOL_DIR_FILE)
+            symbol_directory['df'] = df
+        symbol_directory['meta'] = meta
+        with open(SYMBOL_DIR_META, "w") as f:
+            json.dump(meta, f)
+        return symbol_directory['df']
+
+
+def get_initial_stock_list(no_of_tickers : int):
+
+    # Step 1: Load NASDAQ-listed companies (cached, see get_symbol_directory)
+    df = get_symbol_directory()
 
     # Step 2: Sample 500 random tickers
     sample = df.sample(n=no_of_tickers, random_state=42)[['Symbol', 'Security Name']].reset_index(drop=True)
 
     # Step 3: Get market cap using yfinance
-    market_caps = []
-
     print(f"Fetching market cap for {no_of_tickers} tickers...")
-    for _, row in tqdm(sample.iterrows(), total=no_of_tickers):
-        symbol = row['Symbol']
-        try:
-            stock = yf.Ticker(symbol)
-            info = stock.info
-            market_cap = info.get('marketCap')
-            market_caps.append(market_cap)
-        except:
-            market_caps.append(None)
+    market_caps = get_cached_market_caps(sample['Symbol'])
 
     # Add market cap to the dataframe
-    sample['MarketCap'] = market_caps
-    sample['MarketCap'].fillna(0, inplace=True)
-    sample['MarketCap'] = sample['MarketCap'].astype(int)
+    sample['MarketCap'] = np.nan_to_num(market_caps, nan=0).astype(np.int64)
 
     # Step 4: Display or save
     print(sample.head())
@@ -0,0 +1,87 @@
+import hashlib
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from ttl_cache import TTLCache
+
+# === CONFIGURATION ===
+JOB_WORKERS = 2 # downloads are already concurrent inside a job; shared state is locked by the job itself
+RESULT_TTL = 15 * 60 # seconds a finished result is reused for identical requests
+JOB_TTL = 6 * 60 * 60 # seconds a job id stays queryable
+MAX_JOBS = 1000
+
+
+def request_key(kind, params):
+    """
+    Hash of the job kind and its parameters (e.g. the input universe).
+    """
+    payload = json.dumps({'kind': kind, 'params': params}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class JobManager:
+    """
+    Runs jobs on a background pool. Identical requests (same key) share one job while it is
+    in flight, and reuse its result for RESULT_TTL seconds after it finishes.
+    """
+
+    def __init__(self, workers=JOB_WORKERS, result_ttl=RESULT_TTL, job_ttl=JOB_TTL):
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self.jobs = TTLCache(job_ttl, MAX_JOBS)
+        self.results = TTLCache(result_ttl, MAX_JOBS)
+        self.in_flight = {} # key -> job id
+        self.lock = threading.Lock()
+
+    def submit(self, kind, func, params):
+        """
+        Returns the job id for func(params), starting a job only if no identical one is
+        running and no fresh result is cached.
+        """
+        key = request_key(kind, params)
+        with self.lock:
+            job_id = self.in_flight.get(key)
+            if job_id is not None:
+                return job_id
+
+            job_id = uuid.uuid4().hex
+            job = {'id': job_id, 'kind': kind, 'key': key, 'status': 'queued', 'cached': False,
+                   'submitted_at': time.time(), 'finished_at': None, 'result': None, 'error': None}
+            cached = self.results.get(key)
+            if cached is not None:
+                job.update(status='done', cached=True, result=cached, finished_at=time.time())
+                self.jobs.set(job_id, job)
+                return job_id
+
+            self.jobs.set(job_id, job)
+            self.in_flight[key] = job_id
+        self.pool.submit(self.run, job, func, params)
+        return job_id
+
+    def run(self, job, func, params):
+        job['status'] = 'running'
+        try:
+            job['result'] = func(params)
+            job['status'] = 'done'
+            self.results.set(job['key'], job['result'])
+        except Exception as e:
+            job['error'] = str(e)
+            job['status'] = 'failed'
+        finally:
+            job['finished_at'] = time.time()
+            with self.lock:
+                self.in_flight.pop(job['key'], None)
+            self.jobs.set(job['id'], job) # restart the TTL from completion
+
+    def status(self, job_id):
+        """
+        Job metadata without the result, or None for an unknown/expired id.
+        """
+        job = self.jobs.get(job_id)
+        if job is None:
+            return None
+        return {k: v for k, v in job.items() if k not in ('result', 'key')}
+
+    def result(self, job_id):
+        return self.jobs.get(job_id)
@@ -4,69 +4,224 @@ import numpy as np
 import yfinance as yf # Import yfinance
 import time
 import datetime
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from ohlcv_cache import OHLCVCache
+from indicator_state import (
+    IndicatorState, load_states, save_states,
+    EMA_SPANS, RSI_WINDOW, ROC_PERIOD, VOLUME_SMA_WINDOW
+)
 
+# === RUN CONFIG ===
+PERIOD = '60d' # yfinance period, e.g., '60d', '1y', 'max'
+INTERVAL = '1d' # yfinance interval, e.g., '1d', '1wk', '1mo'
+TOP_PERCENTILE = 0.01
+SCREEN_MODE = 'panel' # 'panel' (all tickers at once), 'incremental' (persisted state) or 'per_ticker'
+USE_CACHE = True # read OHLCV from the local cache and fetch only missing bars
+STREAM_CHUNK_SIZE = 100 # tickers downloaded and screened together by iter_momentum_stocks
 
-def get_stock_data_yfinance(tickers, period, interval):
+# === CHUNKED DOWNLOAD CONFIG ===
+CHUNK_SIZE = 200 # tickers per yf.download call
+MAX_WORKERS = 4 # chunks downloading at the same time
+THREADS_PER_CHUNK = 8 # yfinance threads inside one chunk
+MAX_RETRIES = 3 # attempts per chunk, and per ticker of a chunk that kept failing
+BACKOFF_SECONDS = 2 # base of the exponential backoff between attempts
+
+# Serializes load -> screen -> save of the persisted indicator state, so concurrent runs
+# (request threads, background jobs) cannot overwrite each other's updates.
+STATE_LOCK = threading.Lock()
+
+# Caps yf.download calls in flight across every caller (nested streaming pools, jobs,
+# request threads), so at most MAX_WORKERS * THREADS_PER_CHUNK download threads run at once.
+DOWNLOAD_SLOTS = threading.BoundedSemaphore(MAX_WORKERS)
+
+
+def frames_from_download(data, tickers):
+    """
+    Splits a group_by='ticker' yf.download result into one OHLCV DataFrame per ticker.
+    Tickers with no rows are left out.
+    """
+    frames = {}
+    if data is None or data.empty:
+        return frames
+    # yfinance.download with group_by='ticker' returns a DataFrame with MultiIndex columns:
+    # (Ticker, OHLCV), (Ticker, OHLCV), etc.
+    for ticker in tickers:
+        if (ticker, 'Close') in data.columns:
+            df = data[ticker].copy() # Get data for a single ticker
+            # Standardize column names, using Adj_Close as 'Close' if it is present
+            df.columns = [col.replace(' ', '_') for col in df.columns]
+            df.rename(columns={'Adj_Close': 'Close'}, inplace=True)
+            df = df[['Open', 'High', 'Low', 'Close', 'Volume']].dropna(how='all')
+            if not df.empty:
+                frames[ticker] = df
+    return frames
+
+
+def download_chunk(chunk, retries, backoff, **download_kwargs):
+    """
+    Downloads one chunk of tickers, retrying with jittered exponential backoff.
+    Returns (frames, attempts_used). Raises the last error once retries are exhausted.
+    """
+    for attempt in range(retries):
+        try:
+            with DOWNLOAD_SLOTS:
+                data = yf.download(
+                    tickers=chunk,
+                    group_by='ticker', # Group columns by ticker (e.g., ('AAPL', 'Close'))
+                    auto_adjust=True, # Automatically adjust for splits and dividends
+                    progress=False, # Per-chunk progress bars would interleave
+                    threads=THREADS_PER_CHUNK,
+                    **download_kwargs
+                )
+            return frames_from_download(data, chunk), attempt + 1
+        except Exception as e:
+            if attempt == retries - 1:
+                raise
+            wait = backoff * (2 ** attempt) + random.uniform(0, backoff)
+            print(f"Chunk of {len(chunk)} starting {chunk[0]} failed ({e}), retrying in {wait:.1f}s...")
+            time.sleep(wait)
+
+
+def download_single(ticker, retries, backoff, **download_kwargs):
+    """
+    Downloads one ticker with the chunk backoff, also retrying when yfinance returns no rows
+    instead of raising. Returns (frames, attempts_used); raises once retries are exhausted.
+    """
+    used = 0
+    while used < retries:
+        frames, n = download_chunk([ticker], retries - used, backoff, **download_kwargs)
+        used += n
+        if frames:
+            return frames, used
+        if used >= retries:
+            break
+        wait = backoff * (2 ** (used - 1)) + random.uniform(0, backoff)
+        print(f"No data for {ticker}, retrying in {wait:.1f}s...")
+        time.sleep(wait)
+    raise ValueError(f"no data after {used} attempts")
+
+
+def download_in_chunks(tickers, chunk_size=CHUNK_SIZE, max_workers=MAX_WORKERS,
+                       retries=MAX_RETRIES, backoff=BACKOFF_SECONDS, **download_kwargs):
+    """
+    Downloads the universe in chunks on a bounded thread pool. A chunk that keeps failing is
+    split into single-ticker downloads, and tickers missing from a good chunk (yfinance's usual
+    way of reporting a failed ticker) are retried individually with the same backoff, so one
+    bad ticker or request cannot sink the whole run.
+    Returns (frames, report) where report summarises throughput and failures.
+    """
+    started = time.time()
+    tickers = list(dict.fromkeys(tickers))
+    chunks = [tickers[i:i + chunk_size] for i in range(0, len(tickers), chunk_size)]
+    frames = {}
+    failed_chunks = []
+    retry_singles = [] # tickers retried individually
+    attempts = 0
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(download_chunk, chunk, retries, backoff, **download_kwargs): chunk
+                   for chunk in chunks}
+        for future in as_completed(futures):
+            chunk = futures[future]
+            try:
+                chunk_frames, used = future.result()
+                attempts += used
+                frames.update(chunk_frames)
+                for ticker in chunk:
+                    if ticker not in chunk_frames:
+                        retry_singles.append(ticker)
+            except Exception as e:
+                attempts += retries
+                print(f"Chunk of {len(chunk)} starting {chunk[0]} failed after {retries} attempts: {e}")
+                failed_chunks.append(chunk)
+                retry_singles.extend(chunk)
+
+        futures = {pool.submit(download_single, ticker, retries, backoff, **download_kwargs): ticker
+                   for ticker in retry_singles}
+        for future in as_completed(futures):
+            ticker = futures[future]
+            try:
+                ticker_frames, used = future.result()
+                attempts += used
+                frames.update(ticker_frames)
+            except Exception as e:
+                attempts += retries
+                print(f"Download failed for {ticker}: {e}")
+
+    elapsed = time.time() - started
+    report = {
+        'tickers': len(tickers),
+        'downloaded': len(frames),
+        'chunks': len(chunks),
+        'failed_chunks': len(failed_chunks),
+        'failed_tickers': [t for t in tickers if t not in frames],
+        'requests': attempts,
+        'seconds': round(elapsed, 2),
+        'tickers_per_second': round(len(frames) / elapsed, 1) if elapsed > 0 else None,
+    }
+    print(f"Download report: {report['downloaded']}/{report['tickers']} tickers in {report['seconds']}s "
+          f"({report['tickers_per_second']} tickers/s), {report['chunks']} chunks, "
+          f"{report['failed_chunks']} failed chunks, {report['requests']} requests, "
+          f"{len(report['failed_tickers'])} failed tickers.")
+    return frames, report
+
+
+def chunked_fetcher(tickers, start, end, interval):
+    """
+    OHLCVCache fetcher that goes through download_in_chunks.
+    """
+    frames, _ = download_in_chunks(
+        tickers,
+        start=start.strftime("%Y-%m-%d"),
+        end=end.strftime("%Y-%m-%d"),
+        interval=interval
+    )
+    return frames
+
+
+def get_stock_data_yfinance(tickers, period, interval, cache=None):
     """
     Downloads historical stock data for multiple tickers using yfinance.
     Returns a dictionary where keys are tickers and values are pandas DataFrames.
+    If an OHLCVCache is given, data is read from disk and only missing bars are fetched.
     """
     all_stock_data = {}
     failed_downloads = []
 
-    print("--- Starting Data Download (yfinance) ---")
-    # yfinance can download multiple tickers at once, which is often more efficient.
-    # The result is a MultiIndex DataFrame where the top level is OHLCV and second level is ticker.
-    # We will then unstack it or process it to get individual DataFrames.
+    frames = None
+    if cache is not None:
+        # Cache read/write errors are handled per ticker inside the cache; anything else
+        # falls back to a plain download instead of dropping the whole run.
+        print("--- Starting Data Load (OHLCV cache) ---")
+        try:
+            frames = cache.get(tickers, period, interval)
+        except Exception as e:
+            print(f"OHLCV cache failed ({e}), downloading without it.")
     try:
-        data = yf.download(
-            tickers=tickers,
-            period=period,
-            interval=interval,
-            group_by='ticker', # Group columns by ticker (e.g., ('AAPL', 'Close'))
-            auto_adjust=True, # Automatically adjust for splits and dividends
-            progress=True, # Show download progress
-            # Add this if you faced multi-level index issues in the past, though 'group_by' handles it well
-            # multi_level_index=False
-        )
-
-        # Check if data is empty or if all downloads failed
-        if data.empty:
-            print("No data downloaded. Check tickers and period/interval.")
-            return {}
-
-        # yfinance.download with group_by='ticker' returns a DataFrame with MultiIndex columns:
-        # (Ticker, OHLCV), (Ticker, OHLCV), etc.
-        # We need to extract individual DataFrames for each ticker.
-        for ticker in tickers:
-            # Check if the ticker exists in the downloaded data
-            if (ticker, 'Close') in data.columns:
-                df = data[ticker].copy() # Get data for a single ticker
-                # yfinance automatically sets DatetimeIndex and proper column names
-                # It often includes 'Adj Close', which is usually preferred.
-                # Let's standardize column names for consistency with your previous code
-                df.columns = [col.replace(' ', '_') for col in df.columns] # Replace spaces if any
-                df.rename(columns={'Adj_Close': 'Close'}, inplace=True) # Use Adj_Close as 'Close'
-                df = df[['Open', 'High', 'Low', 'Close', 'Volume']] # Select desired columns
-
-                # Ensure enough data points for indicator calculations
-                if len(df) < 15:
-                    print(f"Not enough data points ({len(df)}) for {ticker}. Skipping for analysis.")
-                    failed_downloads.append(ticker)
-                    continue
-
-                all_stock_data[ticker] = df
-                print(f"Successfully prepared data for {ticker}.")
-            else:
-                print(f"No data found for {ticker} (might have failed download or invalid ticker).")
-                failed_downloads.append(ticker)
-
+        if frames is None:
+            print("--- Starting Data Download (yfinance) ---")
+            frames, _ = download_in_chunks(tickers, period=period, interval=interval)
     except Exception as e:
         print(f"An error occurred during yfinance bulk download: {e}")
         print("This might be due to network issues, invalid tickers, or temporary Yahoo Finance service problems.")
-        # In a bulk download, it's harder to pinpoint individual failures for rate limits
-        # yfinance internally handles some retry logic.
-        pass # Allow script to continue even if bulk download fails for some reason
+        frames = {}
+
+    for ticker in tickers:
+        df = frames.get(ticker)
+        if df is None:
+            print(f"No data found for {ticker} (might have failed download or invalid ticker).")
+            failed_downloads.append(ticker)
+            continue
+
+        # Ensure enough data points for indicator calculations
+        if len(df) < 15:
+            print(f"Not enough data points ({len(df)}) for {ticker}. Skipping for analysis.")
+            failed_downloads.append(ticker)
+            continue
+
+        all_stock_data[ticker] = df
 
     print("\n--- Data Download Complete (yfinance) ---")
     if failed_downloads:
@@ -76,6 +231,29 @@ def get_stock_data_yfinance(tickers, period, interval):
     return all_stock_data
 
 
+def screen_latest(ticker, latest):
+    """
+    Applies the screening conditions to one ticker's latest indicator row.
+    Returns the result row if the ticker passes, otherwise None.
+    """
+    if (
+        latest['RSI_3'] > 70
+        and latest['Close'] > latest['EMA_10']
+        and latest['EMA_5'] > latest['EMA_10'] > latest['EMA_20']
+        and latest['Close'] > latest['EMA_50']
+        and latest['Volume'] > 1.2 * latest['Volume_SMA_50']
+    ):
+        return {
+            'Ticker': ticker,
+            '5D ROC (%)': round(latest['ROC_5'] * 100, 2),
+            'RSI(3)': round(latest['RSI_3'], 1),
+            'Price vs EMA10': round(latest['Close'] / latest['EMA_10'], 3),
+            'EMA Stack': f"{round(latest['EMA_5'],2)} > {round(latest['EMA_10'],2)} > {round(latest['EMA_20'],2)}",
+            'Vol Ratio': round(latest['Volume'] / latest['Volume_SMA_50'], 2)
+        }
+    return None
+
+
 def process_stocks(all_stock_data):
     """
     Processes the downloaded stock data to calculate indicators and apply screening conditions.
@@ -116,26 +294,204 @@ def process_stocks(all_stock_data):
             prev = df_cleaned.iloc[-2]
 
             # === SCREENING CONDITIONS ===
+            row = screen_latest(ticker, latest)
+            if row is not None:
+                results.append(row)
+
+        except Exception as e:
+            print(f"Error processing data for {ticker}: {e}")
+            continue
+
+    print("\n--- Screening Complete ---")
+    return results
+
+
+# === PANEL (CROSS-SECTIONAL) MODE ===
+
+def build_panel(all_stock_data, column):
+    """
+    Stacks one column of every ticker DataFrame into a single dates x tickers frame.
+    """
+    return pd.concat(
+        {ticker: pd.to_numeric(df[column]) for ticker, df in all_stock_data.items()},
+        axis=1
+    )
+
+
+def ema_panel(values, span):
+    """
+    EMA (adjust=False) of every column at once. Leading NaNs are skipped per column,
+    so each ticker seeds on its own first valid bar like pandas' ewm does.
+    """
+    alpha = 2 / (span + 1)
+    out = np.empty_like(values)
+    prev = values[0].copy()
+    out[0] = prev
+    for i in range(1, len(values)):
+        row = values[i]
+        prev = np.where(np.isnan(prev), row, (1 - alpha) * prev + alpha * row)
+        out[i] = prev
+    return out
+
+
+def rsi_panel(close, window):
+    """
+    RSI of every column at once, matching ta.momentum.RSIIndicator(fillna=False).
+    """
+    diff = np.full_like(close, np.nan)
+    diff[1:] = close[1:] - close[:-1]
+    with np.errstate(invalid='ignore'):
+        up = np.where(diff > 0, diff, 0.0)
+        down = np.where(diff < 0, -diff, 0.0)
+
+    alpha = 1 / window
+    ema_up = np.empty_like(up)
+    ema_down = np.empty_like(down)
+    ema_up[0], ema_down[0] = up[0], down[0]
+    for i in range(1, len(close)):
+        ema_up[i] = (1 - alpha) * ema_up[i - 1] + alpha * up[i]
+        ema_down[i] = (1 - alpha) * ema_down[i - 1] + alpha * down[i]
+    ema_up[:window - 1] = np.nan
+    ema_down[:window - 1] = np.nan
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = np.where(ema_down == 0, 100, 100 - (100 / (1 + ema_up / ema_down)))
+    rsi[np.isnan(close)] = np.nan
+    return rsi
+
+
+def sma_panel(values, window):
+    """
+    Simple moving average of every column; NaN until a full window is available.
+    """
+    out = np.full_like(values, np.nan)
+    if len(values) >= window:
+        windows = np.lib.stride_tricks.sliding_window_view(values, window, axis=0)
+        out[window - 1:] = windows.mean(axis=-1)
+    return out
+
+
+def has_interior_gaps(values):
+    """
+    True per column when a NaN appears after the column's first valid value.
+    """
+    seen = np.maximum.accumulate(~np.isnan(values), axis=0)
+    return (seen & np.isnan(values)).any(axis=0)
+
+
+def process_stocks_panel(all_stock_data):
+    """
+    Panel version of process_stocks: computes every indicator and the screening mask for
+    all tickers in a few NumPy passes over dates x tickers arrays.
+    Returns the same result rows, in the same order, as process_stocks.
+    """
+    print("\n--- Starting Panel Data Processing and Screening ---")
+    if not all_stock_data:
+        print("\n--- Screening Complete ---")
+        return []
+
+    tickers = list(all_stock_data)
+    close = build_panel(all_stock_data, 'Close').reindex(columns=tickers).to_numpy(dtype=float)
+    volume = build_panel(all_stock_data, 'Volume').reindex(columns=tickers).to_numpy(dtype=float)
+
+    # Tickers with holes inside their history (or bars missing from the shared index) are
+    # handed to the per-ticker path so results stay identical to process_stocks.
+    fallback = has_interior_gaps(close) | has_interior_gaps(volume)
+
+    # === INDICATORS ===
+    ema = {span: ema_panel(close, span) for span in EMA_SPANS}
+    rsi = rsi_panel(close, RSI_WINDOW)
+    roc = np.full_like(close, np.nan)
+    roc[ROC_PERIOD:] = close[ROC_PERIOD:] / close[:-ROC_PERIOD] - 1
+    volume_sma = sma_panel(volume, VOLUME_SMA_WINDOW)
+
+    complete = ~np.isnan(np.stack([ema[5], ema[10], ema[20], ema[50], rsi, roc, volume_sma])).any(axis=0)
+    enough = complete.sum(axis=0) >= 2
+
+    # === SCREENING CONDITIONS (latest bar) ===
+    c, v = close[-1], volume[-1]
+    e5, e10, e20, e50 = ema[5][-1], ema[10][-1], ema[20][-1], ema[50][-1]
+    with np.errstate(invalid='ignore'):
+        passed = (
+            (rsi[-1] > 70)
+            & (c > e10)
+            & (e5 > e10) & (e10 > e20)
+            & (c > e50)
+            & (v > 1.2 * volume_sma[-1])
+        )
+    passed &= enough & ~fallback
+
+    panel_rows = {}
+    for j in np.flatnonzero(passed):
+        panel_rows[tickers[j]] = {
+            'Ticker': tickers[j],
+            '5D ROC (%)': round(roc[-1, j] * 100, 2),
+            'RSI(3)': round(rsi[-1, j], 1),
+            'Price vs EMA10': round(c[j] / e10[j], 3),
+            'EMA Stack': f"{round(e5[j],2)} > {round(e10[j],2)} > {round(e20[j],2)}",
+            'Vol Ratio': round(v[j] / volume_sma[-1, j], 2)
+        }
+
+    fallback_tickers = [tickers[j] for j in np.flatnonzero(fallback)]
+    if fallback_tickers:
+        print(f"Falling back to per-ticker processing for: {', '.join(fallback_tickers)}")
+        for row in process_stocks({t: all_stock_data[t] for t in fallback_tickers}):
+            panel_rows[row['Ticker']] = row
+
+    print(f"Screened {len(tickers)} tickers, {len(panel_rows)} passed.")
+    print("\n--- Screening Complete ---")
+    return [panel_rows[t] for t in tickers if t in panel_rows]
+
+# === INCREMENTAL (STREAMING) MODE ===
+def process_stocks_incremental(all_stock_data, states):
+    """
+    Streaming version of process_stocks. `states` ({ticker: IndicatorState}) is advanced in place
+    through each ticker's second-to-last bar; the last bar, which may still be forming, is only
+    evaluated on top of it. A run therefore costs O(new bars) per ticker instead of O(history).
+    Tickers without a usable state (new, or history re-adjusted) are seeded from their history.
+    On identical history the indicators match process_stocks; a long-lived state also carries
+    bars from before the download window, so its EMAs are the fully converged values.
+    """
+    results = []
+    seeded = 0
+
+    print("\n--- Starting Incremental Processing and Screening ---")
+    for ticker, df in all_stock_data.items():
+        try:
+            bars = df[['Close', 'Volume']].apply(pd.to_numeric).dropna()
+            if bars.empty:
+                continue
+            committed = bars.iloc[:-1]
+
+            state = states.get(ticker)
+            last_date = pd.Timestamp(state.last_date) if state is not None and state.last_date else None
             if (
-                latest['RSI_3'] > 70
-                and latest['Close'] > latest['EMA_10']
-                and latest['EMA_5'] > latest['EMA_10'] > latest['EMA_20']
-                and latest['Close'] > latest['EMA_50']
-                and latest['Volume'] > 1.2 * latest['Volume_SMA_50']
+                last_date is None
+                or last_date not in committed.index
+                or not np.isclose(committed.loc[last_date, 'Close'], state.last_close, rtol=1e-6)
             ):
-                results.append({
-                    'Ticker': ticker,
-                    '5D ROC (%)': round(latest['ROC_5'] * 100, 2),
-                    'RSI(3)': round(latest['RSI_3'], 1),
-                    'Price vs EMA10': round(latest['Close'] / latest['EMA_10'], 3),
-                    'EMA Stack': f"{round(latest['EMA_5'],2)} > {round(latest['EMA_10'],2)} > {round(latest['EMA_20'],2)}",
-                    'Vol Ratio': round(latest['Volume'] / latest['Volume_SMA_50'], 2)
-                })
+                state = IndicatorState.seed(committed)
+                seeded += 1
+            else:
+                new_bars = committed[committed.index > last_date]
+                for date, close, volume in zip(new_bars.index, new_bars['Close'], new_bars['Volume']):
+                    state.update(date, close, volume)
+            states[ticker] = state
+
+            if state.complete_bars(extra=1) < 2:
+                print(f"Not enough complete data points after indicator calculation for {ticker}. Skipping.")
+                continue
+
+            latest = state.latest(bars['Close'].iloc[-1], bars['Volume'].iloc[-1])
+            row = screen_latest(ticker, latest)
+            if row is not None:
+                results.append(row)
 
         except Exception as e:
             print(f"Error processing data for {ticker}: {e}")
             continue
 
+    print(f"Updated {len(all_stock_data) - seeded} tickers incrementally, seeded {seeded} from history.")
     print("\n--- Screening Complete ---")
     return results
 
@@ -157,22 +513,31 @@ def get_confirmed_list(results, total_tickers_considered, top_percentile):
     return df_top
 
 # === Main Execution ===
+def tickers_from_stock_list(initial_stock_list):
+    sample = pd.DataFrame(initial_stock_list)
+    sample.rename(columns={"Stock Ticker": "Symbol"}, inplace=True)
+    return sample['Symbol'].tolist()
+
+
 def run_momentum_stocks(initial_stock_list):
-    # CONFIG (can be moved into main if you want to avoid global vars)
     #TICKERS = ['AAPL', 'MSFT', 'NVDA', 'TSLA', 'AMZN', 'META', 'GOOGL', 'NFLX', 'SHOP', 'AMD']
     print(f"incoming initial stock list : {initial_stock_list}")
-    sample = pd.DataFrame(initial_stock_list)
-    sample.rename(columns={"Stock Ticker": "Symbol"}, inplace=True)
-    TICKERS = sample['Symbol'].tolist()
-    PERIOD = '60d' # yfinance period, e.g., '60d', '1y', 'max'
-    INTERVAL = '1d' # yfinance interval, e.g., '1d', '1wk', '1mo'
-    TOP_PERCENTILE = 0.01
+    TICKERS = tickers_from_stock_list(initial_stock_list)
 
     # 1. Download data
-    all_stock_data = get_stock_data_yfinance(TICKERS, PERIOD, INTERVAL)
+    cache = OHLCVCache(fetcher=chunked_fetcher) if USE_CACHE else None
+    all_stock_data = get_stock_data_yfinance(TICKERS, PERIOD, INTERVAL, cache=cache)
 
     # 2. Process data and screen
-    momentum_list = process_stocks(all_stock_data)
+    if SCREEN_MODE == 'panel':
+        momentum_list = process_stocks_panel(all_stock_data)
+    elif SCREEN_MODE == 'incremental':
+        with STATE_LOCK:
+            states = load_states()
+            momentum_list = process_stocks_incremental(all_stock_data, states)
+            save_states(states)
+    else:
+        momentum_list = process_stocks(all_stock_data)
 
     # 3. Get confirmed list (top picks)
     # Pass the actual number of tickers for which data was successfully acquired
@@ -187,3 +552,61 @@ def run_momentum_stocks(initial_stock_list):
     print("\n--- Script Finished ---")
 
 
+def iter_momentum_stocks(initial_stock_list, chunk_size=STREAM_CHUNK_SIZE, max_workers=MAX_WORKERS):
+    """
+    Streaming variant of run_momentum_stocks. Chunks of the universe are downloaded
+    concurrently and each chunk is screened as soon as it arrives, so only a few chunks are
+    in memory at a time. Yields records:
+      {'type': 'result', ...screening row}       for every passing ticker
+      {'type': 'progress', 'done': .., ...}      after every chunk
+      {'type': 'summary', 'top_picks': [...]}    once at the end
+    """
+    started = time.time()
+    tickers = list(dict.fromkeys(tickers_from_stock_list(initial_stock_list)))
+    chunks = [tickers[i:i + chunk_size] for i in range(0, len(tickers), chunk_size)]
+    cache = OHLCVCache(fetcher=chunked_fetcher) if USE_CACHE else None
+    results = []
+    done = downloaded = 0
+
+    def screen_chunk(chunk):
+        chunk_data = get_stock_data_yfinance(chunk, PERIOD, INTERVAL, cache=cache)
+        return len(chunk), len(chunk_data), process_stocks_panel(chunk_data)
+
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+    futures = {pool.submit(screen_chunk, chunk): chunk for chunk in chunks}
+    try:
+        for future in as_completed(futures):
+            try:
+                chunk_len, chunk_downloaded, rows = future.result()
+            except Exception as e:
+                print(f"Error screening chunk starting {futures[future][0]}: {e}")
+                chunk_len, chunk_downloaded, rows = len(futures[future]), 0, []
+            done += chunk_len
+            downloaded += chunk_downloaded
+            for row in rows:
+                results.append(row)
+                yield {'type': 'result', **row}
+            yield {
+                'type': 'progress',
+                'done': done,
+                'total': len(tickers),
+                'downloaded': downloaded,
+                'passed': len(results),
+                'elapsed': round(time.time() - started, 2),
+            }
+    finally:
+        # On a client disconnect the generator is closed mid-loop: drop the chunks that have
+        # not started instead of waiting for the whole universe to download.
+        for future in futures:
+            future.cancel()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    top_picks = get_confirmed_list(results, downloaded, TOP_PERCENTILE)
+    yield {
+        'type': 'summary',
+        'total': len(tickers),
+        'downloaded': downloaded,
+        'passed': len(results),
+        'top_picks': top_picks['Ticker'].tolist(),
+        'elapsed': round(time.time() - started, 2),
+    }
@@ -1,11 +1,18 @@
-import requests
+import asyncio
+import aiohttp
 import time
 from datetime import datetime, timedelta
 import pytz
 import os
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
+import sys
 from dotenv import load_dotenv
+from ttl_cache import TTLCache
+from article_store import ArticleStore, article_key
+from poll_scheduler import PollScheduler
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.watchlist import default_watchlist
+from common.telegram import TelegramSender
 
 load_dotenv()
 
@@ -15,60 +22,57 @@ TELEGRAM_BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN')
 TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
 GOOGLE_SHEET_NAME = "Stock_Watchlist"
 GOOGLE_CREDENTIALS_FILE = "your-service-account.json"
-CHECK_INTERVAL = 120  # seconds
+CHECK_INTERVAL = 120  # seconds, first-poll cadence for symbols without history
+REQUESTS_PER_MINUTE = int(os.getenv('NEWS_REQUESTS_PER_MINUTE', 60))  # global polling budget
+WATCHLIST_CHECK_INTERVAL = 30  # seconds; the longest the loop sleeps between watchlist checks
 TIMEZONE = pytz.timezone("Asia/Singapore")
 
-# === CACHED TIMESTAMPS TO AVOID DUPLICATES ===
-latest_timestamps = {}
+# === HTTP ENGINE ===
+# Base URLs are configurable so the watcher can run against a local fake server
+# (TELEGRAM_BASE_URL is read by common/telegram.py).
+FINNHUB_BASE_URL = os.getenv('FINNHUB_BASE_URL', 'https://finnhub.io/api/v1')
+DATALAKE_BASE_URL = os.getenv('DATALAKE_BASE_URL', 'https://v2.datalake.sysautomon.xyz/api')
+MAX_CONNECTIONS = 100  # pooled keep-alive connections in total
+MAX_PER_HOST = 10  # concurrent requests per host
+REQUEST_TIMEOUT = 15  # seconds per request
+
+# === CACHED MARKET CAPS (only used to route between news sources) ===
+MARKET_CAP_TTL = int(os.getenv('MARKET_CAP_TTL', 24 * 60 * 60))  # seconds
+MARKET_CAP_FILE = "news_market_caps.json"  # snapshot for warm restarts
+
+# === STATE (opened by watch(), so importing this module has no side effects) ===
+article_store = None  # alerted articles, to avoid duplicates
+market_caps = None  # TTLCache of market caps
+watchlist = None  # stock symbols from the Google Sheet (cached, see common/watchlist.py)
+telegram = None  # queued, rate limited delivery (see common/telegram.py)
 
-# === Load stock symbols from Google Sheet ===
 def get_symbols_from_google_sheet():
-    """
-    Authenticates with Google Sheets using a service account and
-    fetches stock symbols from the first column of the specified sheet.
-    """
-    try:
-        scope = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
-        creds = ServiceAccountCredentials.from_json_keyfile_name(GOOGLE_CREDENTIALS_FILE, scope)
-        client = gspread.authorize(creds)
-        sheet = client.open(GOOGLE_SHEET_NAME).sheet1
-        symbols = sheet.col_values(1)[1:] # Skip header row
-        return [s.strip().upper() for s in symbols if s.strip()]
-    except Exception as e:
-        print(f"Error loading symbols from Google Sheet: {e}")
-        return []
+    return watchlist.symbols()
+
+async def get_json(session, url, params=None):
+    params = {k: v for k, v in (params or {}).items() if v is not None}  # like requests, drop unset values
+    async with session.get(url, params=params) as response:
+        response.raise_for_status()
+        return await response.json(content_type=None)
 
 # === Fetch market cap from Finnhub ===
-def get_market_cap(symbol):
-    url = f'https://finnhub.io/api/v1/stock/profile2?symbol={symbol}&token={FINNHUB_API_KEY}'
-    response = requests.get(url)
-    data = response.json()
-    return data.get("marketCapitalization", 0) * 1e6  # Convert to absolute USD
+async def get_market_cap(session, symbol):
+    data = await get_json(session, f'{FINNHUB_BASE_URL}/stock/profile2',
+                          {'symbol': symbol, 'token': FINNHUB_API_KEY})
+    return (data.get("marketCapitalization") or 0) * 1e6  # Convert to absolute USD
 
 # === Fetch latest news from Finnhub ===
-def get_latest_news_finnhub(symbol):
+async def get_latest_news_finnhub(session, symbol):
     today = datetime.now().strftime('%Y-%m-%d')
     yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
-    url = f'https://finnhub.io/api/v1/company-news?symbol={symbol}&from={yesterday}&to={today}&token={FINNHUB_API_KEY}'
-    response = requests.get(url)
-    return response.json()
+    return await get_json(session, f'{FINNHUB_BASE_URL}/company-news',
+                          {'symbol': symbol, 'from': yesterday, 'to': today, 'token': FINNHUB_API_KEY})
 
 # === Fetch latest news from alternative API for small caps ===
-def get_latest_news_alt(symbol):
-    url = f'https://v2.datalake.sysautomon.xyz/api/search?pageSize=25&symbol={symbol}&sort=date_desc'
-    response = requests.get(url)
-    data = response.json()
-    return  data['data'].get('newsFeed',[])
-
-# === Send Telegram message ===
-def send_telegram_message(text):
-    url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
-    payload = {
-        "chat_id": TELEGRAM_CHAT_ID,
-        "text": text,
-        "parse_mode": "Markdown"
-    }
-    requests.post(url, json=payload)
+async def get_latest_news_alt(session, symbol):
+    data = await get_json(session, f'{DATALAKE_BASE_URL}/search',
+                          {'pageSize': 25, 'symbol': symbol, 'sort': 'date_desc'})
+    return data['data'].get('newsFeed', [])
 
 # === Format article from Finnhub ===
 def format_finnhub_article(article, symbol):
@@ -82,45 +86,103 @@ def format_alt_article(article, symbol):
     news = article.get("news", "No News")
     return f"*${symbol}* \n\n*{headline}*\n\n{news}\n\n{dt}\n[Read more](https://app.microcapresearch.com/news-feed?sortType=date&sortOrder=desc&symbol={symbol}&open=true)"
 
+# === Check one symbol ===
+async def check_symbol(session, symbol):
+    market_cap = market_caps.get(symbol)
+    if market_cap is None:
+        market_cap = await get_market_cap(session, symbol)
+        market_caps.set(symbol, market_cap)
+        print(f"{symbol} Market Cap: ${market_cap:,.0f}")
+
+    if market_cap < 2_000_000_000:  # Use alternative API
+        news_items = await get_latest_news_alt(session, symbol)
+        new_items = article_store.new_articles(
+            symbol, news_items,
+            key_fn=lambda a: article_key(a.get('id') or a.get('headline'), a['publication_date']),
+            time_fn=lambda a: a['publication_date'] // 1000)
+        formatter = format_alt_article
+    else:  # Use Finnhub
+        news_items = await get_latest_news_finnhub(session, symbol)
+        new_items = article_store.new_articles(
+            symbol, news_items,
+            key_fn=lambda a: article_key(a.get('id') or a.get('url')),
+            time_fn=lambda a: a.get('datetime', 0))
+        formatter = format_finnhub_article
+
+    # Oldest first; an article is recorded once its alert is queued. The Telegram queue is
+    # persisted, so an alert that fails to send is retried rather than lost or repeated.
+    for key, published, article in new_items:
+        telegram.send_message(formatter(article, symbol))
+        article_store.mark_seen(symbol, [(key, published)])
+    return len(new_items)
+
+# === Poll the given symbols concurrently; returns {symbol: new articles} ===
+async def run_cycle(session, symbols, scheduler=None):
+    if scheduler is not None:
+        # due() charged one request per poll; symbols without a cached market cap make a
+        # profile request as well
+        scheduler.charge(sum(1 for s in symbols if s not in market_caps))
+    results = await asyncio.gather(*(check_symbol(session, s) for s in symbols), return_exceptions=True)
+    counts = {}
+    for symbol, result in zip(symbols, results):
+        if isinstance(result, Exception):
+            print(f"Error checking {symbol}: {result!r}")
+            result = 0
+        counts[symbol] = result
+        if scheduler is not None:
+            scheduler.record(symbol, result)  # schedules the symbol's next poll
+    if market_caps.dirty:
+        market_caps.save()
+    await asyncio.to_thread(telegram.flush)  # alerts from this batch, coalesced
+    return counts
+
+def create_session():
+    connector = aiohttp.TCPConnector(limit=MAX_CONNECTIONS, limit_per_host=MAX_PER_HOST)
+    timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+    return aiohttp.ClientSession(connector=connector, timeout=timeout)
+
 # === Main monitoring loop ===
-def main():
-    global latest_timestamps
+# Symbols are polled when due on an adaptive schedule (see poll_scheduler.py): busy names
+# more often, quiet names and off-hours less, all within REQUESTS_PER_MINUTE.
+async def watch():
+    global article_store, market_caps, watchlist, telegram
     print("🔍 Real-time multi-stock news watcher started...")
+    article_store = ArticleStore()
+    market_caps = TTLCache(MARKET_CAP_TTL, path=MARKET_CAP_FILE)
+    watchlist = default_watchlist(GOOGLE_CREDENTIALS_FILE, GOOGLE_SHEET_NAME)
+    telegram = TelegramSender(TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID)
+    scheduler = PollScheduler(requests_per_minute=REQUESTS_PER_MINUTE, default_interval=CHECK_INTERVAL)
+    last_prune = 0
+
+    async with create_session() as session:
+        while True:
+            try:
+                symbols, added, removed = await asyncio.to_thread(watchlist.poll)
+                if added:
+                    print(f"Watching new symbols: {', '.join(added)}")
+                for symbol in added:
+                    scheduler.add(symbol)
+                if removed:
+                    print(f"Stopped watching: {', '.join(removed)}")
+                for symbol in removed:
+                    scheduler.remove(symbol)
+
+                due = scheduler.due()
+                if due:
+                    started = time.monotonic()
+                    counts = await run_cycle(session, due, scheduler)
+                    print(f"Polled {len(due)} of {len(symbols)} symbols in {time.monotonic() - started:.1f}s, "
+                          f"{sum(counts.values())} new articles")
+                if time.time() - last_prune > 60 * 60:
+                    article_store.prune()
+                    last_prune = time.time()
+            except Exception as e:
+                print("Error:", e)
+
+            await asyncio.sleep(min(WATCHLIST_CHECK_INTERVAL, scheduler.next_wakeup()))
 
-    while True:
-        try:
-            symbols = get_symbols_from_google_sheet()
-            for symbol in symbols:
-                if symbol not in latest_timestamps:
-                    latest_timestamps[symbol] = 0
-
-                market_cap = get_market_cap(symbol)
-                print(f"{symbol} Market Cap: ${market_cap:,.0f}")
-
-                if market_cap < 2_000_000_000:  # Use alternative API
-                    news_items = get_latest_news_alt(symbol)
-                    if news_items:
-                        latest_article = news_items[0]
-                        article_time = latest_article['publication_date']//1000
-                        if article_time > latest_timestamps[symbol]:
-                            message = format_alt_article(latest_article, symbol)
-                            send_telegram_message(message)
-                            latest_timestamps[symbol] = article_time
-                else:  # Use Finnhub
-                    news_items = get_latest_news_finnhub(symbol)
-                    if news_items:
-                        latest_article = max(news_items, key=lambda x: x['datetime'])
-                        article_time = latest_article.get("datetime", 0)
-                        if article_time > latest_timestamps[symbol]:
-                            message = format_finnhub_article(latest_article, symbol)
-                            send_telegram_message(message)
-                            latest_timestamps[symbol] = article_time
-
-        except Exception as e:
-            print("Error:", e)
-
-        time.sleep(CHECK_INTERVAL)
+def main():
+    asyncio.run(watch())
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,181 @@
+import os
+import tempfile
+import pandas as pd
+import yfinance as yf
+
+# === CONFIGURATION ===
+CACHE_DIR = "ohlcv_cache"
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+# Relative Close difference on the overlapping bar that means the history was re-adjusted
+# (split/dividend with auto_adjust=True), in which case the ticker is fetched in full again.
+ADJUSTMENT_TOLERANCE = 1e-4
+
+PERIOD_UNITS = {
+    'd': lambda n: pd.DateOffset(days=n),
+    'wk': lambda n: pd.DateOffset(weeks=n),
+    'mo': lambda n: pd.DateOffset(months=n),
+    'y': lambda n: pd.DateOffset(years=n),
+}
+
+
+def period_start(period, now=None):
+    """
+    Converts a yfinance style period ('60d', '6mo', '1y', ...) into a start date.
+    """
+    now = pd.Timestamp(now if now is not None else pd.Timestamp.now()).normalize()
+    for unit, offset in PERIOD_UNITS.items():
+        if period.endswith(unit) and period[:-len(unit)].isdigit():
+            return now - offset(int(period[:-len(unit)]))
+    raise ValueError(f"Unsupported period for the OHLCV cache: {period}")
+
+
+def yfinance_fetcher(tickers, start, end, interval):
+    """
+    Default fetcher: downloads [start, end) for the given tickers from Yahoo Finance.
+    Returns a dictionary where keys are tickers and values are OHLCV DataFrames.
+    """
+    data = yf.download(
+        tickers=tickers,
+        start=start.strftime("%Y-%m-%d"),
+        end=end.strftime("%Y-%m-%d"),
+        interval=interval,
+        group_by='ticker',
+        auto_adjust=True,
+        progress=False,
+    )
+    frames = {}
+    if data.empty:
+        return frames
+    for ticker in tickers:
+        if (ticker, 'Close') in data.columns:
+            df = data[ticker][OHLCV_COLUMNS].dropna(how='all')
+            if not df.empty:
+                frames[ticker] = df
+    return frames
+
+
+class OHLCVCache:
+    """
+    On-disk Parquet store with one file per ticker and interval.
+    Reads are served from disk and only the bars missing since the last stored bar are fetched.
+
+    `fetcher(tickers, start, end, interval)` must return {ticker: OHLCV DataFrame}; pass a fake
+    one to run offline.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, fetcher=yfinance_fetcher):
+        self.cache_dir = cache_dir
+        self.fetcher = fetcher
+
+    def path(self, ticker, interval):
+        safe = ticker.replace('/', '_').replace('^', '_')
+        return os.path.join(self.cache_dir, interval, f"{safe}.parquet")
+
+    def read(self, ticker, interval):
+        """
+        Returns the stored frame, or None if there is none or it cannot be read.
+        """
+        path = self.path(ticker, interval)
+        if not os.path.exists(path):
+            return None
+        try:
+            return pd.read_parquet(path)
+        except Exception as e:
+            print(f"Unreadable cache file for {ticker} ({e}), fetching it in full.")
+            return None
+
+    def write(self, ticker, interval, df):
+        """
+        Writes to a unique temp file and renames it into place, so concurrent writers of the
+        same ticker (server threads, jobs, stream chunks) never see a half-written file.
+        Errors are printed and the ticker just stays uncached until the next run.
+        """
+        path = self.path(ticker, interval)
+        tmp = None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            os.close(fd)
+            df.to_parquet(tmp)
+            os.replace(tmp, path)
+        except Exception as e:
+            print(f"Could not write cache file for {ticker}: {e}")
+            if tmp is not None and os.path.exists(tmp):
+                os.remove(tmp)
+
+    def get(self, tickers, period, interval, now=None):
+        """
+        Returns {ticker: OHLCV DataFrame} covering `period`, fetching only missing bars.
+        """
+        now = pd.Timestamp(now if now is not None else pd.Timestamp.now())
+        start = period_start(period, now)
+        end = now.normalize() + pd.Timedelta(days=1)
+
+        stored = {}
+        # Tickers grouped by the date their delta fetch starts at, so each group is one request.
+        requests_by_start = {}
+        for ticker in tickers:
+            df = self.read(ticker, interval)
+            if df is None or df.empty or df.index[0] > start:
+                fetch_from = start
+            else:
+                stored[ticker] = df
+                # Overlap by two bars: the last one may have been a partial intraday bar,
+                # the one before it is complete and is compared to detect re-adjustment.
+                fetch_from = df.index[max(len(df) - 2, 0)]
+            requests_by_start.setdefault(fetch_from, []).append(ticker)
+
+        full_refetch = []
+        fetched_count = 0
+        for fetch_from, group in requests_by_start.items():
+            try:
+                fetched = self.fetcher(group, fetch_from, end, interval)
+            except Exception as e:
+                print(f"Delta fetch from {fetch_from.date()} failed for {len(group)} tickers: {e}")
+                fetched = {}
+            for ticker in group:
+                new = fetched.get(ticker)
+                if new is None or new.empty:
+                    continue
+                try:
+                    new = new[OHLCV_COLUMNS]
+                    old = stored.get(ticker)
+                    if old is not None:
+                        if fetch_from in old.index and fetch_from in new.index:
+                            before = old.loc[fetch_from, 'Close']
+                            after = new.loc[fetch_from, 'Close']
+                            if abs(after - before) > ADJUSTMENT_TOLERANCE * abs(before):
+                                full_refetch.append(ticker)
+                                continue
+                        new = pd.concat([old[old.index < new.index[0]], new])
+                except Exception as e:
+                    print(f"Could not merge new bars for {ticker}: {e}")
+                    continue
+                stored[ticker] = new
+                self.write(ticker, interval, new)
+                fetched_count += 1
+
+        if full_refetch:
+            print(f"History re-adjusted, refetching in full: {', '.join(full_refetch)}")
+            try:
+                fetched = self.fetcher(full_refetch, start, end, interval)
+            except Exception as e:
+                print(f"Full refetch failed: {e}")
+                fetched = {}
+            for ticker, new in fetched.items():
+                if ticker not in full_refetch or new is None or new.empty:
+                    continue
+                try:
+                    new = new[OHLCV_COLUMNS]
+                except KeyError as e:
+                    print(f"Refetched data for {ticker} is missing columns: {e}")
+                    continue
+                stored[ticker] = new
+                self.write(ticker, interval, new)
+
+        print(f"OHLCV cache: {len(stored)} tickers available, {fetched_count} updated, "
+              f"{len(requests_by_start)} fetch requests.")
+        return {
+            ticker: stored[ticker][stored[ticker].index >= start].copy()
+            for ticker in tickers if ticker in stored
+        }
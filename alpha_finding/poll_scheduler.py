@@ -0,0 +1,223 @@
+import heapq
+import math
+import sqlite3
+import sys
+import time
+from datetime import datetime
+import pytz
+
+# === CONFIGURATION ===
+DEFAULT_INTERVAL = 120  # seconds, for symbols without history (the old fixed cadence)
+MIN_INTERVAL = 30  # seconds
+MAX_INTERVAL = 30 * 60  # seconds
+REQUESTS_PER_MINUTE = 60  # global polling budget
+POLLS_PER_ARTICLE = 8  # aim to poll this many times per expected inter-arrival time
+RATE_HALF_LIFE = 3 * 24 * 60 * 60  # seconds; older observations count half as much
+PRIOR_ARTICLES = 1  # prior: one article per PRIOR_SECONDS until a symbol has its own history
+PRIOR_SECONDS = 6 * 60 * 60
+OFF_HOURS_FACTOR = 3  # poll this much slower outside market hours
+RECENT_ALERT_WINDOW = 30 * 60  # seconds after an alert during which ...
+RECENT_ALERT_FACTOR = 0.5  # ... the interval is shortened by this factor (follow-up stories)
+
+# NASDAQ regular session (21:30-04:00 Asia/Singapore, DST aware through the exchange zone)
+MARKET_TZ = pytz.timezone("America/New_York")
+MARKET_OPEN = (9, 30)
+MARKET_CLOSE = (16, 0)
+
+
+def in_market_hours(ts):
+    local = datetime.fromtimestamp(ts, tz=MARKET_TZ)
+    if local.weekday() >= 5:
+        return False
+    minutes = local.hour * 60 + local.minute
+    return MARKET_OPEN[0] * 60 + MARKET_OPEN[1] <= minutes < MARKET_CLOSE[0] * 60 + MARKET_CLOSE[1]
+
+
+class SymbolStats:
+    __slots__ = ('articles', 'seconds', 'last_update', 'last_alert')
+
+    def __init__(self, now):
+        self.articles = 0.0  # exponentially decayed article count
+        self.seconds = 0.0  # exponentially decayed observed time
+        self.last_update = now
+        self.last_alert = None
+
+
+class PollScheduler:
+    """
+    Priority queue of (next poll time, symbol). Each symbol's interval follows its observed
+    article arrival rate, slows down outside market hours, speeds up right after an alert, and
+    all polls share one token-bucket budget of requests per minute.
+    """
+
+    def __init__(self, requests_per_minute=REQUESTS_PER_MINUTE, default_interval=DEFAULT_INTERVAL,
+                 min_interval=MIN_INTERVAL, max_interval=MAX_INTERVAL, clock=time.time):
+        self.clock = clock
+        self.default_interval = default_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.rate = requests_per_minute / 60
+        self.capacity = max(1.0, requests_per_minute / 6)  # allow ten seconds of burst
+        self.tokens = self.capacity
+        self.tokens_at = clock()
+        self.heap = []
+        self.next_poll = {}  # symbol -> scheduled time; heap entries that disagree are stale
+        self.stats = {}
+
+    def add(self, symbol, delay=0):
+        now = self.clock()
+        if symbol not in self.stats:
+            self.stats[symbol] = SymbolStats(now)
+        self.schedule(symbol, now + delay)
+
+    def remove(self, symbol):
+        self.next_poll.pop(symbol, None)
+        self.stats.pop(symbol, None)
+
+    def schedule(self, symbol, when):
+        self.next_poll[symbol] = when
+        heapq.heappush(self.heap, (when, symbol))
+
+    def interval(self, symbol, now):
+        s = self.stats[symbol]
+        rate = (s.articles + PRIOR_ARTICLES) / (s.seconds + PRIOR_SECONDS)
+        interval = 1 / (rate * POLLS_PER_ARTICLE)
+        if s.articles == 0 and s.seconds < PRIOR_SECONDS:
+            interval = self.default_interval
+        if not in_market_hours(now):
+            interval *= OFF_HOURS_FACTOR
+        if s.last_alert is not None and now - s.last_alert < RECENT_ALERT_WINDOW:
+            interval *= RECENT_ALERT_FACTOR
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    def record(self, symbol, new_articles, now=None):
+        """
+        Feeds back the result of a poll and schedules the symbol's next one.
+        """
+        if symbol not in self.stats:
+            return
+        now = self.clock() if now is None else now
+        s = self.stats[symbol]
+        elapsed = max(0.0, now - s.last_update)
+        decay = 0.5 ** (elapsed / RATE_HALF_LIFE)
+        s.articles = s.articles * decay + new_articles
+        s.seconds = s.seconds * decay + elapsed
+        s.last_update = now
+        if new_articles:
+            s.last_alert = now
+        self.schedule(symbol, now + self.interval(symbol, now))
+
+    def refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.tokens_at) * self.rate)
+        self.tokens_at = now
+
+    def charge(self, cost):
+        """
+        Takes `cost` extra requests from the budget (e.g. a profile lookup made during a poll).
+        The balance may go negative; later polls then wait until it is paid back.
+        """
+        self.refill(self.clock())
+        self.tokens -= cost
+
+    def due(self, cost=1):
+        """
+        Pops the symbols whose poll time has come, earliest first, as far as the budget allows.
+        Symbols left over stay queued and go first next time.
+        """
+        now = self.clock()
+        self.refill(now)
+        symbols = []
+        while self.heap and self.heap[0][0] <= now and self.tokens >= cost:
+            when, symbol = heapq.heappop(self.heap)
+            if self.next_poll.get(symbol) != when:
+                continue
+            del self.next_poll[symbol]
+            self.tokens -= cost
+            symbols.append(symbol)
+        return symbols
+
+    def next_wakeup(self, cost=1):
+        """
+        Seconds until the next poll can run (schedule and budget permitting).
+        """
+        now = self.clock()
+        while self.heap and self.next_poll.get(self.heap[0][1]) != self.heap[0][0]:
+            heapq.heappop(self.heap)
+        if not self.heap:
+            return self.max_interval
+        self.refill(now)
+        budget_wait = 0.0 if self.tokens >= cost else (cost - self.tokens) / self.rate
+        return max(self.heap[0][0] - now, budget_wait, 0.0)
+
+
+# === SIMULATION HARNESS ===
+def simulate(arrivals, start, end, make_scheduler):
+    """
+    Replays recorded article arrival times {symbol: [timestamps]} against a scheduler on a
+    virtual clock. Returns the request count and alert latency statistics. The first poll of
+    a symbol also makes a profile request (the news watcher's market cap lookup), charged to
+    the budget the way run_cycle does.
+    """
+    clock = [start]
+    scheduler = make_scheduler(lambda: clock[0])
+    pending = {symbol: sorted(t for t in times if start <= t < end) for symbol, times in arrivals.items()}
+    for symbol in pending:
+        scheduler.add(symbol)
+
+    requests, latencies, profiled = 0, [], set()
+    while clock[0] < end:
+        due = scheduler.due()
+        new = [symbol for symbol in due if symbol not in profiled]
+        scheduler.charge(len(new))
+        profiled.update(new)
+        requests += len(new)
+        for symbol in due:
+            requests += 1
+            now = clock[0]
+            found = 0
+            while pending[symbol] and pending[symbol][0] <= now:
+                latencies.append(now - pending[symbol].pop(0))
+                found += 1
+            scheduler.record(symbol, found, now)
+        clock[0] += max(1.0, scheduler.next_wakeup())
+
+    missed = sum(len(times) for times in pending.values())
+    latencies.sort()
+    return {
+        'requests': requests,
+        'alerts': len(latencies),
+        'missed': missed,
+        'mean_latency': round(sum(latencies) / len(latencies), 1) if latencies else None,
+        'p95_latency': latencies[int(0.95 * (len(latencies) - 1))] if latencies else None,
+        'max_latency': latencies[-1] if latencies else None,
+    }
+
+
+def fixed_scheduler(interval):
+    """
+    The old behaviour: every symbol every `interval` seconds, unlimited budget.
+    """
+    return lambda clock: PollScheduler(requests_per_minute=math.inf, default_interval=interval,
+                                       min_interval=interval, max_interval=interval, clock=clock)
+
+
+def load_arrivals(db_path):
+    """
+    Recorded arrival times per symbol from the news watcher's article store.
+    """
+    arrivals = {}
+    with sqlite3.connect(db_path) as db:
+        for symbol, published in db.execute("SELECT symbol, published FROM seen_articles"):
+            if published:
+                arrivals.setdefault(symbol, []).append(published)
+    return arrivals
+
+
+if __name__ == "__main__":
+    # python poll_scheduler.py seen_articles.db [days]
+    arrivals = load_arrivals(sys.argv[1] if len(sys.argv) > 1 else "seen_articles.db")
+    days = float(sys.argv[2]) if len(sys.argv) > 2 else 7
+    end = time.time()
+    start = end - days * 24 * 60 * 60
+    print("Fixed 120s:", simulate(arrivals, start, end, fixed_scheduler(DEFAULT_INTERVAL)))
+    print("Adaptive:  ", simulate(arrivals, start, end, lambda clock: PollScheduler(clock=clock)))
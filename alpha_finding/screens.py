@@ -0,0 +1,299 @@
+import json
+import operator
+import re
+import numpy as np
+import pandas as pd
+from momentum_stocks import (
+    get_stock_data_yfinance, chunked_fetcher, tickers_from_stock_list,
+    ema_panel, rsi_panel, sma_panel, PERIOD, INTERVAL, USE_CACHE
+)
+from ohlcv_cache import OHLCVCache
+
+# === CONFIGURATION ===
+SCREENS_FILE = "screens.json"
+
+# Indicator names are '<Kind>_<window>', e.g. EMA_10, RSI_3, Volume_SMA_50.
+BASE_COLUMNS = ('Close', 'Volume')
+INDICATOR_KINDS = {
+    'EMA': lambda close, volume, n: ema_panel(close, n),
+    'SMA': lambda close, volume, n: sma_panel(close, n),
+    'RSI': lambda close, volume, n: rsi_panel(close, n),
+    'ROC': lambda close, volume, n: shift_ratio(close, n) - 1,
+    'Volume_EMA': lambda close, volume, n: ema_panel(volume, n),
+    'Volume_SMA': lambda close, volume, n: sma_panel(volume, n),
+}
+INDICATOR_NAME = re.compile(r'^(?P<kind>[A-Za-z_]+?)_(?P<window>\d+)$')
+
+COMPARISONS = {'>': operator.gt, '>=': operator.ge, '<': operator.lt, '<=': operator.le,
+               '==': operator.eq, '!=': operator.ne}
+ARITHMETIC = {'+': operator.add, '-': operator.sub, '*': operator.mul, '/': operator.truediv}
+TOKEN = re.compile(r'\s*(?:(?P<number>\d+(?:\.\d+)?)|(?P<name>[A-Za-z_][A-Za-z0-9_]*)'
+                   r'|(?P<op>>=|<=|==|!=|[<>+\-*/()]))')
+
+
+def shift_ratio(values, n):
+    out = np.full_like(values, np.nan)
+    out[n:] = values[n:] / values[:-n]
+    return out
+
+
+# === PARSING ===
+def tokenize(text):
+    tokens, pos = [], 0
+    text = text.strip()
+    while pos < len(text):
+        match = TOKEN.match(text, pos)
+        if not match:
+            raise ValueError(f"Cannot parse '{text[pos:]}' in '{text}'")
+        kind = match.lastgroup
+        value = match.group(kind)
+        tokens.append((kind, float(value) if kind == 'number' else value))
+        pos = match.end()
+    return tokens
+
+
+def parse_expression(tokens, pos=0):
+    """
+    expression := term (('+' | '-') term)* ; term := factor (('*' | '/') factor)*
+    factor := number | indicator | '-' factor | '(' expression ')'
+    Returns (tree, next position); trees are ('num', x), ('ind', name), ('neg', tree)
+    or (op, left, right).
+    """
+    def factor(pos):
+        if pos >= len(tokens):
+            raise ValueError("Unexpected end of expression")
+        kind, value = tokens[pos]
+        if kind == 'number':
+            return ('num', value), pos + 1
+        if kind == 'name':
+            return ('ind', value), pos + 1
+        if value == '-':
+            tree, pos = factor(pos + 1)
+            return ('neg', tree), pos
+        if value == '(':
+            tree, pos = expression(pos + 1)
+            if pos >= len(tokens) or tokens[pos][1] != ')':
+                raise ValueError("Missing closing parenthesis")
+            return tree, pos + 1
+        raise ValueError(f"Unexpected '{value}'")
+
+    def binary(pos, operand, ops):
+        tree, pos = operand(pos)
+        while pos < len(tokens) and tokens[pos][0] == 'op' and tokens[pos][1] in ops:
+            op = tokens[pos][1]
+            right, pos = operand(pos + 1)
+            tree = (op, tree, right)
+        return tree, pos
+
+    def term(pos):
+        return binary(pos, factor, ('*', '/'))
+
+    def expression(pos):
+        return binary(pos, term, ('+', '-'))
+
+    return expression(pos)
+
+
+def parse_condition(text):
+    """
+    Parses 'a > b' or a chained 'a > b > c' into [(left, op, right), ...].
+    """
+    tokens = tokenize(text)
+    tree, pos = parse_expression(tokens)
+    comparisons = []
+    while pos < len(tokens):
+        op = tokens[pos][1]
+        if op not in COMPARISONS:
+            raise ValueError(f"Expected a comparison in '{text}', got '{op}'")
+        right, pos = parse_expression(tokens, pos + 1)
+        comparisons.append((tree, op, right))
+        tree = right
+    if not comparisons:
+        raise ValueError(f"Condition '{text}' has no comparison")
+    return comparisons
+
+
+def parse_value(text):
+    tokens = tokenize(text)
+    tree, pos = parse_expression(tokens)
+    if pos != len(tokens):
+        raise ValueError(f"Unexpected '{tokens[pos][1]}' in '{text}'")
+    return tree
+
+
+def referenced(tree, names):
+    if tree[0] == 'ind':
+        names.add(tree[1])
+    elif tree[0] == 'neg':
+        referenced(tree[1], names)
+    elif tree[0] != 'num':
+        referenced(tree[1], names)
+        referenced(tree[2], names)
+    return names
+
+
+def check_indicator(name):
+    if name in BASE_COLUMNS:
+        return
+    match = INDICATOR_NAME.match(name)
+    if not match or match.group('kind') not in INDICATOR_KINDS:
+        raise ValueError(f"Unknown indicator '{name}'")
+
+
+# === COMPILATION ===
+def check_definition(definition):
+    """
+    Raises ValueError for a definition that is not shaped like the ones in screens.json.
+    """
+    if not isinstance(definition, dict):
+        raise ValueError(f"Screen definition must be an object, got {definition!r}")
+    if not isinstance(definition.get('name'), str) or not definition['name']:
+        raise ValueError(f"Screen definition is missing a 'name': {definition!r}")
+    conditions = definition.get('conditions')
+    if not isinstance(conditions, list) or not conditions or not all(isinstance(c, str) for c in conditions):
+        raise ValueError(f"Screen '{definition['name']}' needs a non-empty list of 'conditions' strings")
+    columns = definition.get('columns', [])
+    if not isinstance(columns, list):
+        raise ValueError(f"Screen '{definition['name']}' has 'columns' that is not a list")
+    for column in columns:
+        if not isinstance(column, dict) or 'name' not in column or not (
+                isinstance(column.get('value'), str) or isinstance(column.get('template'), str)):
+            raise ValueError(f"Screen '{definition['name']}' has an invalid column {column!r}: "
+                             f"needs a 'name' and a 'value' or 'template' string")
+        if column.get('round') is not None and not isinstance(column['round'], int):
+            raise ValueError(f"Screen '{definition['name']}' column '{column['name']}' has a non-integer 'round'")
+
+
+def compile_screens(definitions):
+    """
+    Compiles screen definitions into one evaluation plan. Each definition is
+      {"name": ..., "conditions": ["RSI_3 > 70", "EMA_5 > EMA_10 > EMA_20", ...],
+       "columns": [{"name": "RSI(3)", "value": "RSI_3", "round": 1},
+                   {"name": "EMA Stack", "template": "{EMA_5} > {EMA_10}", "round": 2}]}
+    Indicators used by several screens appear once in plan['indicators'].
+    """
+    if not isinstance(definitions, list):
+        raise ValueError("Screens must be a list of definitions")
+    plan = {'indicators': set(), 'screens': []}
+    for definition in definitions:
+        check_definition(definition)
+        if any(screen['name'] == definition['name'] for screen in plan['screens']):
+            raise ValueError(f"Duplicate screen name '{definition['name']}'")
+        screen = {'name': definition['name'], 'conditions': [], 'columns': [], 'requires': set()}
+        for text in definition['conditions']:
+            for left, op, right in parse_condition(text):
+                screen['conditions'].append((left, op, right))
+                referenced(left, screen['requires'])
+                referenced(right, screen['requires'])
+        for column in definition.get('columns', []):
+            digits = column.get('round')
+            if 'template' in column:
+                fields = re.findall(r'\{(\w+)\}', column['template'])
+                screen['columns'].append((column['name'], 'template', column['template'], digits))
+                screen['requires'].update(fields)
+            else:
+                tree = parse_value(column['value'])
+                screen['columns'].append((column['name'], 'value', tree, digits))
+                referenced(tree, screen['requires'])
+        for name in screen['requires']:
+            check_indicator(name)
+        plan['indicators'] |= screen['requires']
+        plan['screens'].append(screen)
+    return plan
+
+
+def load_screens(path=SCREENS_FILE):
+    with open(path) as f:
+        return json.load(f)
+
+
+# === EVALUATION ===
+def bar_aligned_panel(all_stock_data):
+    """
+    Close and Volume as bars x tickers arrays with each ticker's valid bars right-aligned,
+    so the last row is every ticker's own latest bar (what process_stocks screens).
+    """
+    tickers = list(all_stock_data)
+    close = pd.concat({t: pd.to_numeric(df['Close']) for t, df in all_stock_data.items()}, axis=1)
+    volume = pd.concat({t: pd.to_numeric(df['Volume']) for t, df in all_stock_data.items()}, axis=1)
+    close = close.reindex(columns=tickers).to_numpy(dtype=float)
+    volume = volume.reindex(columns=tickers).to_numpy(dtype=float)
+    valid = ~(np.isnan(close) | np.isnan(volume))
+    order = np.argsort(valid, axis=0, kind='stable')
+    close = np.take_along_axis(np.where(valid, close, np.nan), order, axis=0)
+    volume = np.take_along_axis(np.where(valid, volume, np.nan), order, axis=0)
+    return tickers, close, volume
+
+
+def compute_indicators(names, close, volume):
+    values = {'Close': close, 'Volume': volume}
+    for name in names:
+        if name not in values:
+            match = INDICATOR_NAME.match(name)
+            values[name] = INDICATOR_KINDS[match.group('kind')](close, volume, int(match.group('window')))
+    return values
+
+
+def evaluate(tree, latest):
+    if tree[0] == 'num':
+        return tree[1]
+    if tree[0] == 'ind':
+        return latest[tree[1]]
+    if tree[0] == 'neg':
+        return -evaluate(tree[1], latest)
+    return ARITHMETIC[tree[0]](evaluate(tree[1], latest), evaluate(tree[2], latest))
+
+
+def run_plan(plan, all_stock_data):
+    """
+    Evaluates every screen of a compiled plan in a single pass over the universe.
+    Returns {screen name: result rows}, rows in the same format as process_stocks.
+    """
+    results = {screen['name']: [] for screen in plan['screens']}
+    if not all_stock_data:
+        return results
+
+    tickers, close, volume = bar_aligned_panel(all_stock_data)
+    values = compute_indicators(sorted(plan['indicators']), close, volume)
+    latest = {name: array[-1] for name, array in values.items()}
+    complete_rows = {name: (~np.isnan(array)).sum(axis=0) for name, array in values.items()}
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for screen in plan['screens']:
+            # A ticker is screened only with >= 2 rows where every indicator it uses is defined.
+            # Indicators only become defined once, so the shortest history decides.
+            enough = np.full(len(tickers), True)
+            for name in screen['requires']:
+                enough &= complete_rows[name] >= 2
+                enough &= ~np.isnan(latest[name])
+            passed = enough
+            for left, op, right in screen['conditions']:
+                passed = passed & COMPARISONS[op](evaluate(left, latest), evaluate(right, latest))
+
+            for j in np.flatnonzero(passed):
+                row = {'Ticker': tickers[j]}
+                for name, kind, spec, digits in screen['columns']:
+                    if kind == 'template':
+                        row[name] = re.sub(
+                            r'\{(\w+)\}', lambda m: str(round(latest[m.group(1)][j], digits)), spec)
+                    else:
+                        value = evaluate(spec, latest)
+                        value = value[j] if np.ndim(value) else value
+                        row[name] = round(value, digits) if digits is not None else value
+                results[screen['name']].append(row)
+
+    return results
+
+
+def run_screens(initial_stock_list, definitions=None):
+    """
+    Downloads the universe once and runs every screen on it.
+    """
+    tickers = tickers_from_stock_list(initial_stock_list)
+    plan = compile_screens(definitions if definitions is not None else load_screens())
+    cache = OHLCVCache(fetcher=chunked_fetcher) if USE_CACHE else None
+    all_stock_data = get_stock_data_yfinance(tickers, PERIOD, INTERVAL, cache=cache)
+    results = run_plan(plan, all_stock_data)
+    for name, rows in results.items():
+        print(f"Screen {name}: {len(rows)} of {len(all_stock_data)} tickers passed.")
+    return results
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+from backtest import run_backtest
+from momentum_stocks import process_stocks
+from test_momentum_panel import DATES, copies, universe
+
+
+def panels(data):
+    close = pd.concat({t: df['Close'] for t, df in data.items()}, axis=1)
+    volume = pd.concat({t: df['Volume'] for t, df in data.items()}, axis=1)
+    return close, volume
+
+
+def test_universe_forward_returns_and_hit_rates():
+    close, volume = panels(universe(0))
+    summary, _ = run_backtest(close, volume, horizons=(1, 5), top_percentile=0.1)
+    for h in (1, 5):
+        fwd = (close.ffill(limit=5).shift(-h) / close - 1).to_numpy()
+        values = fwd[close.notna().to_numpy() & ~np.isnan(fwd)]
+        assert summary.loc[h, 'Universe Signals'] == values.size
+        assert summary.loc[h, 'Universe Mean Return (%)'] == pytest.approx(round(values.mean() * 100, 3))
+        assert summary.loc[h, 'Universe Hit Rate'] == pytest.approx(round((values > 0).mean(), 3))
+
+
+def test_last_date_matches_process_stocks_and_pick_returns():
+    data = universe(0)
+    close, volume = panels(data)
+    summary, picks = run_backtest(close, volume, horizons=(1,), top_percentile=1.0)
+    # Gapped tickers are forward-filled in the panel but screened on their own bars by
+    # process_stocks, so compare the tickers without interior or trailing gaps
+    gapless = [t for t in close.columns if close[t].loc[close[t].first_valid_index():].notna().all()]
+    expected = {row['Ticker'] for row in process_stocks(copies(data))} & set(gapless)
+    assert set(picks.loc[picks['Date'] == DATES[-1], 'Ticker']) & set(gapless) == expected
+    assert expected
+
+    earlier = picks[picks['Date'] < DATES[-1]]
+    for _, row in earlier.iterrows():
+        i = DATES.get_loc(row['Date'])
+        series = close[row['Ticker']].ffill(limit=5)
+        assert row['Fwd 1D (%)'] == pytest.approx(round((series.iloc[i + 1] / series.iloc[i] - 1) * 100, 2))
+
+
+def test_missing_volume_is_not_a_zero():
+    data = universe(0)
+    close, volume = panels(data)
+    _, picks = run_backtest(close, volume, horizons=(1,), top_percentile=1.0)
+    ticker = picks.loc[picks['Date'] == DATES[-1], 'Ticker'].iloc[0]
+    # A bar without volume leaves the 50-bar volume average undefined for the following bars,
+    # as in process_stocks, instead of counting as a 0 that makes later volume look high.
+    volume.loc[DATES[-3], ticker] = np.nan
+    _, picks = run_backtest(close, volume, horizons=(1,), top_percentile=1.0)
+    assert ticker not in set(picks.loc[picks['Date'] == DATES[-1], 'Ticker'])
@@ -0,0 +1,26 @@
+import pandas as pd
+import pytest
+import momentum_stocks
+
+
+@pytest.mark.parametrize("outcomes", [
+    ["empty", "error", "error"],
+    ["error", "empty", "empty"],
+    ["error", "error", "empty"],
+    ["error", "empty", "error", "empty"],
+])
+def test_download_single_stays_within_retries(monkeypatch, outcomes):
+    calls = []
+
+    def download(**kwargs):
+        outcome = outcomes[len(calls)]  # IndexError if the budget is overspent
+        calls.append(outcome)
+        if outcome == "error":
+            raise ConnectionError("rate limited")
+        return pd.DataFrame()
+
+    monkeypatch.setattr(momentum_stocks.yf, 'download', download)
+    with pytest.raises(Exception) as raised:
+        momentum_stocks.download_single("AAA", 3, 0)
+    assert not isinstance(raised.value, IndexError)
+    assert calls == outcomes[:3]
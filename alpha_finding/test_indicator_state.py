@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+import ta
+from indicator_state import IndicatorState, load_states, save_states
+from momentum_stocks import process_stocks, process_stocks_incremental
+from test_momentum_panel import DATES, copies, synthetic_stock
+
+
+def universe(seed=0):
+    rng = np.random.default_rng(seed)
+    data = {f"T{i:02d}": synthetic_stock(rng, DATES, breakout=i % 3 == 0) for i in range(20)}
+    data['LATE'] = synthetic_stock(rng, DATES[30:], breakout=True)
+    data['HOLE'] = synthetic_stock(rng, DATES, breakout=True).drop(DATES[50:52])
+    return data
+
+
+def batch_indicators(df):
+    """
+    The indicator columns process_stocks computes, for comparison.
+    """
+    return pd.DataFrame({
+        'EMA_5': df['Close'].ewm(span=5, adjust=False).mean(),
+        'EMA_10': df['Close'].ewm(span=10, adjust=False).mean(),
+        'EMA_20': df['Close'].ewm(span=20, adjust=False).mean(),
+        'EMA_50': df['Close'].ewm(span=50, adjust=False).mean(),
+        'RSI_3': ta.momentum.RSIIndicator(df['Close'], window=3).rsi(),
+        'ROC_5': df['Close'].pct_change(5),
+        'Volume_SMA_50': df['Volume'].rolling(window=50).mean(),
+    })
+
+
+def test_seed_matches_batch_indicators():
+    df = universe()['T00']
+    expected = batch_indicators(df).iloc[-1]
+    latest = IndicatorState.seed(df.iloc[:-1]).latest(df['Close'].iloc[-1], df['Volume'].iloc[-1])
+    for column, value in expected.items():
+        assert latest[column] == pytest.approx(value, rel=1e-9), column
+
+
+def test_cold_incremental_matches_batch():
+    data = universe()
+    assert process_stocks_incremental(copies(data), {}) == process_stocks(copies(data))
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_warm_day_by_day_with_persisted_state(tmp_path, capsys, seed):
+    data = universe(seed)
+    path = str(tmp_path / "indicator_state.json")
+    passed = 0
+    for day in range(70, len(DATES) + 1):
+        window = {t: df[df.index <= DATES[day - 1]] for t, df in data.items()}
+        window = {t: df for t, df in window.items() if not df.empty}
+        states = load_states(path)
+        results = process_stocks_incremental(copies(window), states)
+        save_states(states, path)
+        assert results == process_stocks(copies(window)), DATES[day - 1]
+        passed += len(results)
+        out = capsys.readouterr().out
+        if day > 70:
+            assert "seeded 0 from history" in out
+    assert passed > 0
+
+
+def test_state_round_trip(tmp_path):
+    data = universe()
+    states = {t: IndicatorState.seed(df.iloc[:-1]) for t, df in data.items()}
+    path = str(tmp_path / "indicator_state.json")
+    save_states(states, path)
+    loaded = load_states(path)
+    assert loaded.keys() == states.keys()
+    for ticker, state in states.items():
+        assert loaded[ticker].to_dict() == state.to_dict()
+        last = data[ticker].iloc[-1]
+        assert loaded[ticker].latest(last['Close'], last['Volume']) == state.latest(last['Close'], last['Volume'])
+
+
+def test_unreadable_state_is_a_cold_start(tmp_path):
+    path = str(tmp_path / "indicator_state.json")
+    with open(path, "w") as f:
+        f.write("{not json")
+    assert load_states(path) == {}
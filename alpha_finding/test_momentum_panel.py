@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+from momentum_stocks import process_stocks, process_stocks_panel
+
+DATES = pd.bdate_range("2025-01-02", periods=90)
+
+
+def synthetic_stock(rng, dates, breakout):
+    """
+    Random-walk OHLCV; a breakout ticker rallies on rising volume over its last bars so it
+    can pass the screen.
+    """
+    n = len(dates)
+    returns = rng.normal(0, 0.01, n)
+    volume = rng.uniform(1e5, 2e5, n)
+    if breakout:
+        returns[-8:] = np.abs(returns[-8:]) + 0.02
+        volume[-1] *= 3
+    close = 50 * np.exp(np.cumsum(returns))
+    return pd.DataFrame({'Open': close, 'High': close * 1.01, 'Low': close * 0.99,
+                         'Close': close, 'Volume': volume}, index=dates)
+
+
+def universe(seed=0):
+    rng = np.random.default_rng(seed)
+    data = {f"T{i:02d}": synthetic_stock(rng, DATES, breakout=i % 3 == 0) for i in range(30)}
+    # Leading gaps: shorter histories that start later
+    data['LATE1'] = synthetic_stock(rng, DATES[20:], breakout=True)
+    data['LATE2'] = synthetic_stock(rng, DATES[75:], breakout=True)  # too short to screen
+    # Interior gaps: bars missing in the middle of the history
+    data['HOLE1'] = synthetic_stock(rng, DATES, breakout=True).drop(DATES[40:43])
+    data['HOLE2'] = synthetic_stock(rng, DATES, breakout=False).drop(DATES[60])
+    # Trailing gaps: histories that stop before the last date
+    data['STALE1'] = synthetic_stock(rng, DATES[:-2], breakout=True)
+    data['STALE2'] = synthetic_stock(rng, DATES[:-5], breakout=False)
+    return data
+
+
+def copies(data):
+    return {ticker: df.copy() for ticker, df in data.items()}  # process_stocks adds columns in place
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_panel_matches_per_ticker(seed):
+    data = universe(seed)
+    expected = process_stocks(copies(data))
+    assert process_stocks_panel(copies(data)) == expected
+
+
+def test_panel_exercises_passing_and_gapped_tickers():
+    data = universe(0)
+    passed = {row['Ticker'] for row in process_stocks(copies(data))}
+    assert any(t.startswith("T") for t in passed)
+    assert passed & {'LATE1', 'HOLE1', 'STALE1'}
+    assert 'LATE2' not in passed
+
+
+def test_panel_empty():
+    assert process_stocks_panel({}) == []
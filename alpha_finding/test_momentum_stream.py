@@ -0,0 +1,40 @@
+import threading
+import time
+import numpy as np
+import momentum_stocks
+from test_momentum_panel import DATES, synthetic_stock
+
+
+def fake_download(calls):
+    def get_stock_data(tickers, period, interval, cache=None):
+        with calls['lock']:
+            calls['tickers'].extend(tickers)
+        time.sleep(0.2)
+        rng = np.random.default_rng(len(calls['tickers']))
+        return {t: synthetic_stock(rng, DATES, breakout=True) for t in tickers}
+    return get_stock_data
+
+
+def stock_list(tickers):
+    return [{'Symbol': t} for t in tickers]
+
+
+def test_stream_deduplicates_and_stops_on_close(monkeypatch):
+    calls = {'tickers': [], 'lock': threading.Lock()}
+    monkeypatch.setattr(momentum_stocks, 'get_stock_data_yfinance', fake_download(calls))
+    monkeypatch.setattr(momentum_stocks, 'USE_CACHE', False)
+    tickers = [f"T{i:03d}" for i in range(40)]
+
+    records = list(momentum_stocks.iter_momentum_stocks(stock_list(tickers + tickers[:10]),
+                                                        chunk_size=10, max_workers=2))
+    assert sorted(calls['tickers']) == tickers
+    assert records[-1]['type'] == 'summary' and records[-1]['total'] == 40
+
+    calls['tickers'].clear()
+    stream = momentum_stocks.iter_momentum_stocks(stock_list(tickers * 5), chunk_size=2, max_workers=2)
+    next(stream)
+    started = time.perf_counter()
+    stream.close()
+    assert time.perf_counter() - started < 0.5
+    time.sleep(0.5)
+    assert len(calls['tickers']) < 20
@@ -0,0 +1,96 @@
+import asyncio
+import time
+from aiohttp import web
+import news
+from article_store import ArticleStore
+from ttl_cache import TTLCache
+
+NOW = int(time.time())
+PROFILES = {'BIG': 3_000_000, 'SMALL': 500}  # Finnhub reports millions
+FINNHUB_NEWS = {'BIG': [{'id': i, 'headline': f"Big {i}", 'url': f"https://example.com/{i}",
+                         'datetime': NOW - 600 + i} for i in range(3)]}
+DATALAKE_NEWS = {'SMALL': [{'id': f"s{i}", 'headline': f"Small {i}", 'news': "Body",
+                            'publication_date': (NOW - 600 + i) * 1000} for i in range(2)]}
+
+
+class RecordingSender:
+    def __init__(self):
+        self.messages = []
+        self.flushes = 0
+
+    def send_message(self, text, parse_mode="Markdown", chat_id=None):
+        self.messages.append(text)
+
+    def flush(self):
+        self.flushes += 1
+        return 0
+
+
+def fake_server(requests):
+    """
+    Finnhub and datalake endpoints serving the fixtures above; every request is recorded.
+    """
+    async def profile(request):
+        requests.append(('profile', request.query['symbol']))
+        if request.query['symbol'] == 'BROKEN':
+            return web.Response(status=500)
+        return web.json_response({'marketCapitalization': PROFILES[request.query['symbol']]})
+
+    async def company_news(request):
+        requests.append(('finnhub', request.query['symbol']))
+        return web.json_response(FINNHUB_NEWS[request.query['symbol']])
+
+    async def search(request):
+        requests.append(('datalake', request.query['symbol']))
+        return web.json_response({'data': {'newsFeed': DATALAKE_NEWS[request.query['symbol']]}})
+
+    app = web.Application()
+    app.router.add_get('/finnhub/stock/profile2', profile)
+    app.router.add_get('/finnhub/company-news', company_news)
+    app.router.add_get('/datalake/search', search)
+    return app
+
+
+async def polls(symbols, cycles, requests):
+    runner = web.AppRunner(fake_server(requests))
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    base = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+    news.FINNHUB_BASE_URL = f"{base}/finnhub"
+    news.DATALAKE_BASE_URL = f"{base}/datalake"
+    try:
+        async with news.create_session() as session:
+            return [await news.run_cycle(session, symbols) for _ in range(cycles)]
+    finally:
+        await runner.cleanup()
+
+
+def test_run_cycle_against_local_server(tmp_path, monkeypatch):
+    sender = RecordingSender()
+    monkeypatch.setattr(news, 'telegram', sender)
+    monkeypatch.setattr(news, 'article_store', ArticleStore(str(tmp_path / "seen.db")))
+    monkeypatch.setattr(news, 'market_caps', TTLCache(60, path=str(tmp_path / "caps.json")))
+    # polls() points the base URLs at the local server; restore them after the test
+    monkeypatch.setattr(news, 'FINNHUB_BASE_URL', news.FINNHUB_BASE_URL)
+    monkeypatch.setattr(news, 'DATALAKE_BASE_URL', news.DATALAKE_BASE_URL)
+    requests = []
+
+    counts = asyncio.run(polls(['BIG', 'SMALL', 'BROKEN'], 2, requests))
+    # First poll: only the newest article per new symbol is alerted; the second finds nothing
+    assert counts == [{'BIG': 1, 'SMALL': 1, 'BROKEN': 0}, {'BIG': 0, 'SMALL': 0, 'BROKEN': 0}]
+    assert len(sender.messages) == 2 and sender.flushes == 2
+    assert any("Big 2" in m for m in sender.messages) and any("Small 1" in m for m in sender.messages)
+    # Market caps are fetched once and cached; large caps go to Finnhub, small caps to the datalake
+    assert requests.count(('profile', 'BIG')) == 1 and requests.count(('profile', 'SMALL')) == 1
+    assert requests.count(('finnhub', 'BIG')) == 2 and requests.count(('datalake', 'SMALL')) == 2
+    assert news.market_caps.get('BIG') == 3e12
+
+    # A newer article is alerted on the next poll
+    FINNHUB_NEWS['BIG'].append({'id': 9, 'headline': "Big 9", 'url': "https://example.com/9",
+                                'datetime': NOW})
+    try:
+        counts = asyncio.run(polls(['BIG'], 1, requests))
+    finally:
+        FINNHUB_NEWS['BIG'].pop()
+    assert counts == [{'BIG': 1}] and "Big 9" in sender.messages[-1]
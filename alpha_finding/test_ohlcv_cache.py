@@ -0,0 +1,74 @@
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from ohlcv_cache import OHLCVCache
+
+DATES = pd.bdate_range("2025-01-02", periods=60)
+
+
+def source_frame(scale=1.0):
+    close = scale * 50 * np.exp(np.cumsum(np.random.default_rng(0).normal(0, 0.01, len(DATES))))
+    return pd.DataFrame({'Open': close, 'High': close * 1.01, 'Low': close * 0.99,
+                         'Close': close, 'Volume': np.full(len(DATES), 1e5)}, index=DATES)
+
+
+class FakeFetcher:
+    """
+    Serves bars from in-memory frames and records every (tickers, start) request.
+    """
+
+    def __init__(self, frames):
+        self.frames = frames
+        self.calls = []
+
+    def __call__(self, tickers, start, end, interval):
+        self.calls.append((sorted(tickers), start))
+        return {t: self.frames[t][(self.frames[t].index >= start) & (self.frames[t].index < end)]
+                for t in tickers if t in self.frames}
+
+
+def test_cold_then_only_missing_bars(tmp_path):
+    source = {'AAA': source_frame(), 'BBB': source_frame(2.0)}
+    fetcher = FakeFetcher({t: df.iloc[:40] for t, df in source.items()})
+    cache = OHLCVCache(str(tmp_path), fetcher)
+    now = DATES[39]
+    first = cache.get(['AAA', 'BBB'], '1mo', '1d', now=now)
+    assert len(fetcher.calls) == 1
+    pd.testing.assert_frame_equal(first['AAA'], source['AAA'].loc[first['AAA'].index])
+
+    # Ten more bars: one grouped request starting two bars before the last stored one
+    fetcher.frames = {t: df.iloc[:50] for t, df in source.items()}
+    fetcher.calls.clear()
+    second = cache.get(['AAA', 'BBB'], '1mo', '1d', now=DATES[49])
+    assert fetcher.calls == [(['AAA', 'BBB'], DATES[38])]
+    for ticker in source:
+        expected = source[ticker].loc[second[ticker].index[0]:DATES[49]]
+        pd.testing.assert_frame_equal(second[ticker], expected, check_freq=False)
+
+
+def test_readjusted_history_is_refetched_in_full(tmp_path):
+    fetcher = FakeFetcher({'AAA': source_frame().iloc[:40]})
+    cache = OHLCVCache(str(tmp_path), fetcher)
+    cache.get(['AAA'], '1mo', '1d', now=DATES[39])
+
+    # A 2:1 split re-adjusts the whole history
+    split = source_frame(0.5).iloc[:45]
+    fetcher.frames = {'AAA': split}
+    fetcher.calls.clear()
+    result = cache.get(['AAA'], '1mo', '1d', now=DATES[44])
+    # The overlap bar no longer matches, so the delta is discarded and the period refetched
+    assert len(fetcher.calls) == 2
+    assert fetcher.calls[0][1] == DATES[38] and fetcher.calls[1][1] < DATES[30]
+    pd.testing.assert_frame_equal(result['AAA'], split.loc[result['AAA'].index], check_freq=False)
+    pd.testing.assert_frame_equal(cache.read('AAA', '1d'), split.loc[cache.read('AAA', '1d').index],
+                                  check_freq=False)
+
+
+def test_concurrent_writes_of_one_ticker(tmp_path):
+    cache = OHLCVCache(str(tmp_path), FakeFetcher({}))
+    frames = [source_frame(scale) for scale in (1.0, 2.0, 3.0, 4.0)] * 5
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(lambda df: cache.write('AAA', '1d', df), frames))
+    stored = cache.read('AAA', '1d')
+    assert any(stored.equals(df) for df in frames)
+    assert sorted(p.name for p in (tmp_path / '1d').iterdir()) == ['AAA.parquet']
@@ -0,0 +1,48 @@
+import numpy as np
+from poll_scheduler import DEFAULT_INTERVAL, MAX_INTERVAL, PollScheduler, fixed_scheduler, simulate
+
+START = 1_736_000_000.0  # a Saturday in January 2025 (UTC)
+DAY = 24 * 60 * 60
+
+
+def poisson_arrivals(rng, per_day, days):
+    n = rng.poisson(per_day * days)
+    return sorted(START + rng.uniform(0, days * DAY, n))
+
+
+def test_budget_includes_profile_requests():
+    arrivals = {f"S{i:03d}": [] for i in range(300)}
+    end = START + 60 * 60
+    stats = simulate(arrivals, START, end,
+                     lambda clock: PollScheduler(requests_per_minute=60, min_interval=1, clock=clock))
+    capacity = 60 / 6
+    assert stats['requests'] <= 60 * 60 + capacity + 1
+
+
+def test_charge_delays_later_polls():
+    clock = [START]
+    scheduler = PollScheduler(requests_per_minute=60, clock=lambda: clock[0])
+    for i in range(20):
+        scheduler.add(f"S{i}")
+    assert len(scheduler.due()) == 10  # ten seconds of burst
+    scheduler.charge(10)
+    assert scheduler.due() == []
+    assert scheduler.next_wakeup() == 11  # 10 tokens owed + 1 for the next poll, at 1 per second
+    clock[0] += 11
+    assert len(scheduler.due()) == 1
+
+
+def test_adaptive_beats_fixed_on_synthetic_arrivals():
+    rng = np.random.default_rng(0)
+    days = 7
+    arrivals = {f"BUSY{i}": poisson_arrivals(rng, 40, days) for i in range(5)}
+    arrivals.update({f"QUIET{i}": poisson_arrivals(rng, 0.5, days) for i in range(45)})
+    end = START + days * DAY
+    fixed = simulate(arrivals, START, end, fixed_scheduler(DEFAULT_INTERVAL))
+    adaptive = simulate(arrivals, START, end, lambda clock: PollScheduler(clock=clock))
+
+    # Far fewer requests, every article still alerted, no wait beyond the longest interval
+    assert adaptive['requests'] < fixed['requests'] / 5
+    assert adaptive['missed'] == fixed['missed'] == 0
+    assert adaptive['alerts'] == fixed['alerts']
+    assert adaptive['max_latency'] <= MAX_INTERVAL + 1
@@ -0,0 +1,51 @@
+import os
+import pytest
+from momentum_stocks import process_stocks
+from screens import compile_screens, load_screens, parse_value, run_plan
+from test_momentum_panel import copies, universe
+
+SCREENS_JSON = os.path.join(os.path.dirname(os.path.abspath(__file__)), "screens.json")
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_momentum_screen_matches_process_stocks(seed):
+    data = universe(seed)
+    plan = compile_screens(load_screens(SCREENS_JSON))
+    assert run_plan(plan, copies(data))['momentum'] == process_stocks(copies(data))
+
+
+def test_unary_minus():
+    data = universe(0)
+    plan = compile_screens([
+        {'name': 'neg', 'conditions': ['-ROC_5 < -(0 - 1)', 'ROC_5 > -1'],
+         'columns': [{'name': 'Minus ROC', 'value': '-ROC_5 * -100', 'round': 2}]},
+        {'name': 'pos', 'conditions': ['ROC_5 > -1', 'ROC_5 * 100 > -1 * 1000']},
+    ])
+    results = run_plan(plan, copies(data))
+    assert len(results['neg']) == len(results['pos']) > 0
+    assert parse_value('--Close') == ('neg', ('neg', ('ind', 'Close')))
+    roc = data['T00']['Close'].pct_change(5).iloc[-1]
+    row = next(row for row in results['neg'] if row['Ticker'] == 'T00')
+    assert row['Minus ROC'] == pytest.approx(round(roc * 100, 2))
+
+
+@pytest.mark.parametrize("definitions", [
+    {'name': 'not a list'},
+    [{'conditions': ['Close > 1']}],
+    [{'name': 'x'}],
+    [{'name': 'x', 'conditions': 'Close > 1'}],
+    [{'name': 'x', 'conditions': ['Close > 1'], 'columns': [{'name': 'c'}]}],
+    [{'name': 'x', 'conditions': ['Close > 1']}, {'name': 'x', 'conditions': ['Close > 2']}],
+    [{'name': 'x', 'conditions': ['Close > Foo_3']}],
+])
+def test_invalid_definitions_raise_value_error(definitions):
+    with pytest.raises(ValueError):
+        compile_screens(definitions)
+
+
+def test_run_screens_endpoint_rejects_bad_definitions():
+    from app import app
+    response = app.test_client().post('/run_screens', json={
+        'stocks': [{'Symbol': 'AAA'}], 'screens': [{'conditions': ['Close > 1']}]})
+    assert response.status_code == 400
+    assert 'name' in response.get_json()['error']
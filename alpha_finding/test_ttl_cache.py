@@ -0,0 +1,23 @@
+import json
+import threading
+from ttl_cache import TTLCache
+
+
+def test_concurrent_saves(tmp_path):
+    path = str(tmp_path / "cache.json")
+    cache = TTLCache(60, path=path)
+
+    def writer(n):
+        for i in range(50):
+            cache.set(f"{n}-{i}", i)
+            cache.save()
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    with open(path) as f:
+        assert len(json.load(f)) == 200
+    assert [p.name for p in tmp_path.iterdir()] == ["cache.json"]
+    assert TTLCache(60, path=path).get("3-49") == 49
@@ -0,0 +1,83 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    Thread-safe in-memory cache with a per-cache TTL and least-recently-used eviction.
+    Optionally persisted to a JSON file so a restart starts warm.
+    """
+
+    def __init__(self, ttl, max_entries=10000, path=None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.path = path
+        self.entries = OrderedDict() # key -> (value, stored_at)
+        self.dirty = False # set since the last save
+        self.lock = threading.Lock()
+        self.save_lock = threading.Lock() # one writer at a time, without blocking get/set on disk I/O
+        if path:
+            self.load()
+
+    def get(self, key, default=None):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return default
+            if time.time() - entry[1] > self.ttl:
+                del self.entries[key]
+                return default
+            self.entries.move_to_end(key)
+            return entry[0]
+
+    def __contains__(self, key):
+        sentinel = object()
+        return self.get(key, sentinel) is not sentinel
+
+    def set(self, key, value, stored_at=None):
+        with self.lock:
+            self.entries[key] = (value, stored_at if stored_at is not None else time.time())
+            self.entries.move_to_end(key)
+            self.dirty = True
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                raw = json.load(f)
+        except Exception as e:
+            print(f"Could not load cache {self.path}: {e}")
+            return
+        now = time.time()
+        for key, (value, stored_at) in raw.items():
+            if now - stored_at <= self.ttl:
+                self.set(key, value, stored_at)
+        self.dirty = False
+
+    def save(self):
+        """
+        Writes a snapshot to a unique temp file and renames it into place. Saves are
+        serialized, so a later snapshot is never overwritten by an earlier one.
+        """
+        if not self.path:
+            return
+        with self.save_lock:
+            with self.lock:
+                raw = dict(self.entries)
+                self.dirty = False
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(raw, f)
+                os.replace(tmp, self.path)
+            except Exception:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+                raise
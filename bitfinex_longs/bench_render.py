@@ -0,0 +1,51 @@
+#Benchmark: longs chart render time vs history length, LTTB-downsampled vs full resolution
+
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.charts import lttb, render
+from bitfinex_longs import MAX_PLOT_POINTS, longs_chart
+
+SIZES = (8_760, 105_120, 525_600)  # a year of hourly, 5-minute and 1-minute bars
+
+
+def synthetic_series(n, seed=0):
+    rng = np.random.default_rng(seed)
+    time_index = pd.Series(pd.date_range("2025-01-01", periods=n, freq="min"))
+    longs = pd.Series(np.cumsum(rng.normal(size=n)))
+    btc = pd.DataFrame({'time': time_index, 'close': 50000 + np.cumsum(rng.normal(size=n))})
+    return time_index, longs, btc
+
+
+def downsampled(time_index, longs, btc, points=MAX_PLOT_POINTS):
+    """
+    The same downsampling longs() applies before plotting.
+    """
+    seconds = time_index.astype('int64')
+    keep = lttb(seconds, longs, points)
+    y = (longs - longs.iloc[0]).iloc[keep].reset_index(drop=True)
+    x = time_index.iloc[keep].reset_index(drop=True)
+    btc = btc.iloc[lttb(btc['time'].astype('int64'), btc['close'], points)]
+    return x, y, btc
+
+
+if __name__ == "__main__":
+    # python bench_render.py [--full]   (--full also renders every point, slow for large sizes)
+    full = "--full" in sys.argv
+    render(longs_chart, *downsampled(*synthetic_series(1000)), 365)  # warm-up: fonts, caches
+    for n in SIZES:
+        time_index, longs, btc = synthetic_series(n)
+        started = time.perf_counter()
+        x, y, btc_small = downsampled(time_index, longs, btc)
+        lttb_seconds = time.perf_counter() - started
+        _, stats = render(longs_chart, x, y, btc_small, 365)
+        line = (f"{n} points: lttb {lttb_seconds:.3f}s + render {stats['seconds']}s "
+                f"({len(x)} plotted, peak RSS {stats['peak_rss_mb']} MB)")
+        if full:
+            _, stats = render(longs_chart, time_index, longs - longs.iloc[0], btc, 365)
+            line += f" | full resolution {stats['seconds']}s (peak RSS {stats['peak_rss_mb']} MB)"
+        print(line)
@@ -4,89 +4,118 @@ import yfinance as yf
 import matplotlib.pyplot as plt
 
 import os
+import sys
+import time
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.charts import lttb, render_many
+from common.telegram import TelegramSender
+from series_store import SeriesStore
+
 load_dotenv()
 
 TELEGRAM_BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN')
 TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
 
 
-def send_telegram_photo(photo_path, text):
-    url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendPhoto"
-
-    files = {"photo": open(photo_path, "rb")}
-    
-    payload = {}
-    if "_" in TELEGRAM_CHAT_ID:
-        ids = TELEGRAM_CHAT_ID.split("_")
-        payload = {
-            "chat_id": ids[0],
-            "message_thread_id": ids[1],
-            "caption": text
-        }
-    else:
-        payload = {
-            "chat_id": TELEGRAM_CHAT_ID,
-            "caption": text
-        }
-
-    response = requests.post(url, data=payload, files=files)
-    print(response.json())
-
-
-def longs():
-    num_days = 365
-
-    url ="https://s1.bitcoinwisdom.io/period?step=86400&symbol=bitfinexbtcusdlongs&3d_format=&nonce=1763022521"
-
-    response = requests.get(url)
-
-    if response.status_code == 200:
-
-        data = response.json()
-
-        timestamp = [i[0] for i in data]
-        longs = [i[3] for i in data]
-
-        data = {
-            'timestamp' : timestamp,
-            'longs' : longs
-        }
-
-        df = pd.DataFrame(data)
-
-        df['time'] = pd.to_datetime(df['timestamp'], unit = 's')
-
-        # Get current time
-        now = pd.Timestamp.now()
-
-        # Define cutoff date (365 days ago)
-        cutoff = now - pd.Timedelta(days=num_days)
-
-        # Filter only last 365 days
-        df_last_year = df[df['time'] >= cutoff]
-        
-    else:
+# === CONFIGURATION ===
+NUM_DAYS = 365
+STEP = int(os.getenv('LONGS_STEP', 86400))  # seconds per longs bar, e.g. 3600 or 300 for intraday
+MAX_PLOT_POINTS = 2000  # about one point per horizontal pixel of the 20in x 100dpi chart
+LONGS_URL = "https://s1.bitcoinwisdom.io/period"
+LONGS_SYMBOL = "bitfinexbtcusdlongs"
+REQUEST_TIMEOUT = 30  # seconds
+
+# === Local append-only history (completed bars only, see series_store.py) ===
+longs_store = SeriesStore(f"bitfinex_longs_{STEP}.csv", "longs")
+btc_store = SeriesStore("btc_usd_1d.csv", "close")
+
+
+def fetch_longs(since=None):
+    """
+    Longs bars from bitcoinwisdom; `since` (last stored timestamp) asks only for newer bars.
+    """
+    params = {'step': STEP, 'symbol': LONGS_SYMBOL, '3d_format': '', 'nonce': int(time.time())}
+    if since is not None:
+        params['since'] = since
+    response = requests.get(LONGS_URL, params=params, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    data = response.json()
+    return pd.DataFrame({'timestamp': [i[0] for i in data], 'longs': [i[3] for i in data]})
+
+
+def fetch_btc(since=None):
+    """
+    Daily BTC-USD closes from Yahoo Finance, starting at the last stored bar (or NUM_DAYS ago).
+    """
+    start = pd.Timestamp.now() - pd.Timedelta(days=NUM_DAYS) if since is None else pd.to_datetime(since, unit='s')
+    btc = yf.download("BTC-USD", start=start.strftime("%Y-%m-%d"), interval="1d", progress=False)
+    close = btc['Close']
+    if isinstance(close, pd.DataFrame):
+        close = close.iloc[:, 0]
+    close = close.dropna()
+    timestamps = (close.index.tz_localize(None) - pd.Timestamp("1970-01-01")) // pd.Timedelta(seconds=1)
+    return pd.DataFrame({'timestamp': timestamps, 'close': close.to_numpy()})
+
+
+def load_series(store, fetch, step, since):
+    """
+    Fetches the bars after the last stored one and appends the completed ones. Returns the
+    stored series from `since` plus the in-progress bar. If the fetch fails the stored
+    series is used as it is.
+    """
+    partial = pd.DataFrame()
+    try:
+        fresh = fetch(store.last_timestamp())
+        completed = fresh['timestamp'] + step <= time.time()
+        added = store.append(fresh[completed])
+        partial = fresh[~completed].assign(time=lambda d: pd.to_datetime(d['timestamp'], unit='s'))
+        print(f"{store.path}: {added} new bars")
+    except Exception as e:
+        print(f"Unable to update {store.path}, using stored data: {e}")
+    df = store.read(since)
+    return pd.concat([df, partial], ignore_index=True) if not partial.empty else df
+
+
+def longs_vs_btc(num_days=NUM_DAYS):
+    """
+    Longs and BTC close on the longs timestamps (as-of join: the latest BTC close at or
+    before each longs bar). None when there is no longs data at all.
+    """
+    since = int(time.time()) - num_days * 86400
+    longs_df = load_series(longs_store, fetch_longs, STEP, since)
+    btc_df = load_series(btc_store, fetch_btc, 86400, since)
+    if longs_df.empty:
+        return None
+    return pd.merge_asof(longs_df[['time', 'longs']].sort_values('time'),
+                         btc_df[['time', 'close']].sort_values('time'),
+                         on='time', direction='backward')
+
+
+def longs(num_days=NUM_DAYS):
+    df = longs_vs_btc(num_days)
+    if df is None:
         print("unable to get data for bitfinex btc longs")
-        
-    y = df_last_year['longs'] - df_last_year['longs'].iloc[0]
-    x = df_last_year['time']
-
-    period_num = str(num_days)+'d'
+        return None
 
-    btc = yf.download("BTC-USD", period=period_num, interval="1d").reset_index()
-    btc = btc[['Date', 'Close']]
+    # Full-resolution series are stored; only the plot is downsampled (LTTB keeps spikes and turns)
+    seconds = df['time'].astype('int64')
+    keep = lttb(seconds, df['longs'], MAX_PLOT_POINTS)
+    y = (df['longs'] - df['longs'].iloc[0]).iloc[keep].reset_index(drop=True)
+    x = df['time'].iloc[keep].reset_index(drop=True)
+    btc_df = df[['time', 'close']].dropna()
+    btc_df = btc_df.iloc[lttb(btc_df['time'].astype('int64'), btc_df['close'], MAX_PLOT_POINTS)]
+    print(f"Plotting {len(keep)} of {len(df)} longs points")
 
-    time = btc['Date'].tolist()
-    close = btc['Close']['BTC-USD'].tolist()
-    btc_df = {
-        'time' : time,
-        'close': close
-    }
+    png, _ = render_many([(longs_chart, (x, y, btc_df, num_days), {})])[0]
+    return png
 
-    btc_df = pd.DataFrame(btc_df)
 
+def longs_chart(x, y, btc_df, num_days):
+    """
+    Longs change over the period as a green/red area with the BTC price on a second axis.
+    """
     # --- Create figure / primary axis ---
     fig, ax1 = plt.subplots(figsize=(20, 10))
 
@@ -132,8 +161,13 @@ def longs():
     ax1.legend(lines1 + lines2, labels1 + labels2, loc='upper left', fontsize=14)
 
     fig.tight_layout()
-    plt.savefig('bitfinex_longs.png')
+    return fig
 
 if __name__ == "__main__":
-    longs()
-    send_telegram_photo('bitfinex_longs.png',"Bitfinex Longs vs BTC Chart")
\ No newline at end of file
+    # Created here, not at import, so importing the chart code (e.g. bench_render.py) never
+    # loads or flushes the Telegram queue
+    telegram = TelegramSender(TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID)
+    png = longs()
+    if png:
+        telegram.send_photo(png, "Bitfinex Longs vs BTC Chart")
+        telegram.flush()
\ No newline at end of file
@@ -0,0 +1,54 @@
+import os
+import pandas as pd
+
+
+class SeriesStore:
+    """
+    Append-only CSV time series of (timestamp, value), timestamps in UTC epoch seconds.
+    Only rows newer than the last stored timestamp are ever written, and the last timestamp
+    is read from the end of the file, so an update costs O(new rows).
+    """
+
+    def __init__(self, path, column):
+        self.path = path
+        self.column = column
+
+    def last_timestamp(self):
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            f.seek(max(0, size - 4096))
+            lines = f.read().decode().strip().splitlines()
+        last = lines[-1].split(",")[0] if lines else ""
+        return int(last) if last.isdigit() else None
+
+    def append(self, df):
+        """
+        Appends the rows of df (columns 'timestamp' and self.column) newer than the last
+        stored timestamp. Returns the number of rows written.
+        """
+        last = self.last_timestamp()
+        new = df[['timestamp', self.column]].dropna().sort_values('timestamp')
+        new = new.drop_duplicates('timestamp', keep='last')
+        if last is not None:
+            new = new[new['timestamp'] > last]
+        if new.empty:
+            return 0
+        header = not os.path.exists(self.path)
+        new.astype({'timestamp': 'int64'}).to_csv(self.path, mode="a", header=header, index=False)
+        return len(new)
+
+    def read(self, since=None):
+        """
+        Stored rows (optionally from `since`, a UTC epoch) with a 'time' column added.
+        """
+        if not os.path.exists(self.path):
+            return pd.DataFrame({'timestamp': pd.Series(dtype='int64'), self.column: pd.Series(dtype=float),
+                                 'time': pd.Series(dtype='datetime64[s]')})
+        df = pd.read_csv(self.path)
+        if since is not None:
+            df = df[df['timestamp'] >= since]
+        df['time'] = pd.to_datetime(df['timestamp'], unit='s')
+        return df.reset_index(drop=True)
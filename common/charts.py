@@ -0,0 +1,116 @@
+import io
+import multiprocessing
+import os
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import matplotlib
+import numpy as np
+
+matplotlib.use("Agg")  # headless: no display, no GUI event loop
+import matplotlib.pyplot as plt
+
+# === CONFIGURATION ===
+DEFAULT_DPI = 100
+MAX_PROCESSES = 4
+
+
+def lttb(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets downsampling: indices of n_out points (first and last
+    included) that keep the visual shape of y over x, for plotting long series at one point
+    per pixel. Cost is O(len(y)) whatever n_out is.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)  # n_out - 2 buckets between the end points
+    kept = np.empty(n_out, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):  # the next bucket's average is the third triangle vertex
+            next_x, next_y = x[end:edges[i + 2]].mean(), y[end:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        area = np.abs((x[a] - next_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (next_y - y[a]))
+        a = start + int(np.argmax(area))
+        kept[i + 1] = a
+    return kept
+
+
+def reset_peak_rss():
+    """
+    Resets the process's peak RSS counter (Linux); elsewhere the peak is since process start.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def peak_rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # bytes on macOS, KB elsewhere
+    return round(max_rss / (2 ** 20 if sys.platform == "darwin" else 2 ** 10), 1)
+
+
+def render(draw, *args, savefig_kwargs=None, **kwargs):
+    """
+    Calls draw(*args, **kwargs), which must return a matplotlib Figure, and renders it to PNG
+    in memory (savefig_kwargs e.g. {'dpi': 300, 'bbox_inches': 'tight'}).
+    Returns (png bytes, stats) with render seconds and the process's peak RSS while rendering.
+    """
+    options = {'dpi': DEFAULT_DPI, **(savefig_kwargs or {}), 'format': 'png'}
+    reset_peak_rss()
+    started = time.perf_counter()
+    fig = draw(*args, **kwargs)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, **options)
+    plt.close(fig)
+    stats = {
+        'chart': getattr(draw, '__name__', str(draw)),
+        'seconds': round(time.perf_counter() - started, 3),
+        'peak_rss_mb': peak_rss_mb(),
+        'bytes': buffer.tell(),
+    }
+    return buffer.getvalue(), stats
+
+
+def _render_job(job):
+    draw, args, kwargs = job
+    return render(draw, *args, **kwargs)
+
+
+def render_many(jobs, processes=MAX_PROCESSES):
+    """
+    Renders several charts, in parallel worker processes when there is more than one.
+    jobs: list of (draw, args, kwargs) as for render(); draw must be a module-level function
+    so it can be sent to a worker. Returns [(png bytes, stats)] in job order and prints the stats.
+    """
+    started = time.perf_counter()
+    processes = min(processes, os.cpu_count() or 1)
+    if len(jobs) <= 1 or processes <= 1:
+        results = [_render_job(job) for job in jobs]
+    else:
+        # fork: workers inherit the loaded modules instead of re-running the calling script
+        method = "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+        with ProcessPoolExecutor(max_workers=min(processes, len(jobs)),
+                                 mp_context=multiprocessing.get_context(method)) as pool:
+            results = list(pool.map(_render_job, jobs))
+    for i, (_, stats) in enumerate(results, 1):
+        print(f"Rendered chart {i}/{len(jobs)} ({stats['chart']}) in {stats['seconds']}s, "
+              f"peak RSS {stats['peak_rss_mb']} MB, {stats['bytes'] / 1024:.0f} KB")
+    print(f"Rendered {len(jobs)} charts in {time.perf_counter() - started:.2f}s")
+    return results
@@ -0,0 +1,324 @@
+import atexit
+import itertools
+import json
+import os
+import tempfile
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+
+# === CONFIGURATION ===
+TELEGRAM_BASE_URL = os.getenv('TELEGRAM_BASE_URL', 'https://api.telegram.org')
+QUEUE_FILE = "telegram_queue.jsonl"  # undelivered messages, retried on the next run
+MESSAGE_LIMIT = 4096  # characters per text message
+CAPTION_LIMIT = 1024  # characters per photo caption
+CHAT_RATE = 1.0  # messages per second to one private chat
+GROUP_RATE = 20 / 60  # messages per second to one group or channel
+GLOBAL_RATE = 25.0  # messages per second per bot (Telegram allows ~30)
+MAX_ATTEMPTS = 5
+BACKOFF_SECONDS = 2
+REQUEST_TIMEOUT = 30  # seconds
+
+
+def parse_chat_id(chat_id):
+    """
+    '<chat id>_<topic id>' posts into a forum topic, a plain id into the chat itself.
+    Only a numeric suffix is a topic, so usernames like '@my_channel' stay whole.
+    """
+    chat_id = str(chat_id)
+    chat, sep, thread = chat_id.rpartition("_")
+    if sep and chat and thread.isdigit():
+        return chat, thread
+    return chat_id, None
+
+
+def split_text(text, limit=MESSAGE_LIMIT):
+    """
+    Splits text into chunks of at most `limit` characters, preferring line breaks, then spaces.
+    """
+    chunks = []
+    while len(text) > limit:
+        cut = text.rfind("\n", 0, limit)
+        if cut <= 0:
+            cut = text.rfind(" ", 0, limit)
+        if cut <= 0:
+            cut = limit
+        chunks.append(text[:cut])
+        text = text[cut:].lstrip("\n")
+    if text:
+        chunks.append(text)
+    return chunks
+
+
+class RateLimiter:
+    """
+    Blocking token bucket: acquire() waits until a token is available.
+    """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                time.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds):
+        """
+        Holds every caller back for `seconds` (Telegram's retry_after).
+        """
+        with self.lock:
+            self.tokens = min(self.tokens, 0) - seconds * self.rate
+            self.updated = time.monotonic()
+
+
+class TelegramSender:
+    """
+    Queued Telegram delivery over one pooled session. Messages are queued (and persisted) on
+    send and delivered by flush(), which also runs at exit: consecutive texts to the same chat
+    are coalesced up to the 4096-character limit, per-chat and global rate limits are
+    respected, 429 retry_after is honoured, and anything still undeliverable stays in the
+    queue file for the next run.
+    """
+
+    def __init__(self, token, chat_id, base_url=TELEGRAM_BASE_URL, queue_file=QUEUE_FILE,
+                 coalesce=True):
+        self.token = token
+        self.chat_id = chat_id
+        self.base_url = base_url
+        self.queue_file = queue_file
+        self.coalesce = coalesce
+        self.session = requests.Session()
+        for scheme in ("https://", "http://"):
+            self.session.mount(scheme, HTTPAdapter(pool_connections=4, pool_maxsize=4))
+        self.limiters = {}
+        self.global_limiter = RateLimiter(GLOBAL_RATE, capacity=GLOBAL_RATE)
+        self.queue = []
+        self.lock = threading.Lock()  # guards the queue; senders never wait for the network
+        self.flush_lock = threading.Lock()  # one flush at a time
+        self.load()
+        self.pid = os.getpid()
+        atexit.register(self.flush_at_exit)
+
+    def flush_at_exit(self):
+        if os.getpid() == self.pid:  # not in forked workers (e.g. chart rendering)
+            self.flush()
+
+    # === QUEUE ===
+    # The queue file is an append-only log: one {"add": item} line per queued message and one
+    # {"done": n} line when the first n items are delivered, so a send costs one short write
+    # however long the queue is. Photos are stored as separate files next to it. The log is
+    # compacted once per flush.
+    def load(self):
+        if not self.queue_file or not os.path.exists(self.queue_file):
+            return
+        try:
+            with open(self.queue_file) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        print(f"Skipping a damaged line in Telegram queue {self.queue_file}")
+                        continue
+                    if 'add' in entry:
+                        self.queue.append(entry['add'])
+                    else:
+                        self.remove_photos(self.queue[:entry['done']])
+                        del self.queue[:entry['done']]
+            if self.queue:
+                print(f"Telegram: {len(self.queue)} undelivered messages from the last run")
+        except Exception as e:
+            print(f"Could not load Telegram queue {self.queue_file}: {e}")
+
+    def append_log(self, entries):
+        if not self.queue_file:
+            return
+        with open(self.queue_file, "a") as f:
+            f.write("".join(json.dumps(entry) + "\n" for entry in entries))
+
+    def compact(self):
+        """
+        Rewrites the log as just the items still queued (or removes it when none are).
+        """
+        if not self.queue_file:
+            return
+        if not self.queue:
+            if os.path.exists(self.queue_file):
+                os.remove(self.queue_file)
+            if os.path.isdir(self.queue_file + ".photos") and not os.listdir(self.queue_file + ".photos"):
+                os.rmdir(self.queue_file + ".photos")
+            return
+        directory = os.path.dirname(os.path.abspath(self.queue_file))
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=os.path.basename(self.queue_file) + ".", suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            f.write("".join(json.dumps({'add': item}) + "\n" for item in self.queue))
+        os.replace(tmp, self.queue_file)
+
+    def store_photo(self, data):
+        """
+        Writes photo bytes to their own file and returns its path (None without a queue file,
+        in which case the bytes stay in memory).
+        """
+        if not self.queue_file:
+            return None
+        directory = self.queue_file + ".photos"
+        os.makedirs(directory, exist_ok=True)
+        fd, path = tempfile.mkstemp(dir=directory, suffix=".png")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        return path
+
+    def remove_photos(self, items):
+        for item in items:
+            if item.get('photo_file') and os.path.exists(item['photo_file']):
+                os.remove(item['photo_file'])
+
+    def send_message(self, text, parse_mode="Markdown", chat_id=None):
+        """
+        Queues a text message; longer texts are split at the 4096-character limit.
+        """
+        chat, thread = parse_chat_id(chat_id or self.chat_id)
+        items = [{'method': 'sendMessage', 'chat_id': chat, 'thread': thread,
+                  'text': chunk, 'parse_mode': parse_mode} for chunk in split_text(text)]
+        with self.lock:
+            self.queue.extend(items)
+            self.append_log({'add': item} for item in items)
+
+    def send_photo(self, photo, caption="", chat_id=None):
+        """
+        Queues a photo, given as a file path or PNG bytes. Caption text beyond Telegram's
+        limit follows as a message.
+        """
+        if isinstance(photo, (bytes, bytearray)):
+            data = bytes(photo)
+        else:
+            with open(photo, "rb") as f:
+                data = f.read()
+        chat, thread = parse_chat_id(chat_id or self.chat_id)
+        item = {'method': 'sendPhoto', 'chat_id': chat, 'thread': thread,
+                'caption': caption[:CAPTION_LIMIT], 'photo_file': self.store_photo(data)}
+        if item['photo_file'] is None:
+            item['photo'] = data
+        with self.lock:
+            self.queue.append(item)
+            self.append_log([{'add': item}])
+        if len(caption) > CAPTION_LIMIT:
+            self.send_message(caption[CAPTION_LIMIT:], parse_mode=None, chat_id=chat_id)
+
+    # === DELIVERY ===
+    def limiter(self, chat):
+        if chat not in self.limiters:
+            group = chat.startswith("-")  # groups, supergroups and channels have negative ids
+            self.limiters[chat] = RateLimiter(GROUP_RATE if group else CHAT_RATE)
+        return self.limiters[chat]
+
+    def next_batch(self):
+        """
+        The head of the queue merged with following texts to the same chat while the result
+        stays within the message limit, and the number of queue items it covers.
+        """
+        item = dict(self.queue[0])
+        taken = 1
+        if self.coalesce and item['method'] == 'sendMessage':
+            for nxt in itertools.islice(self.queue, 1, None):
+                same = (nxt['method'] == 'sendMessage' and nxt['chat_id'] == item['chat_id']
+                        and nxt['thread'] == item['thread'] and nxt['parse_mode'] == item['parse_mode'])
+                if not same or len(item['text']) + 2 + len(nxt['text']) > MESSAGE_LIMIT:
+                    break
+                item['text'] += "\n\n" + nxt['text']
+                taken += 1
+        return item, taken
+
+    def post(self, item):
+        data = {'chat_id': item['chat_id']}
+        if item['thread']:
+            data['message_thread_id'] = item['thread']
+        url = f"{self.base_url}/bot{self.token}/{item['method']}"
+        if item['method'] == 'sendPhoto':
+            data['caption'] = item['caption']
+            if item.get('photo_file'):
+                with open(item['photo_file'], "rb") as f:
+                    photo = f.read()
+            else:
+                photo = item['photo']
+            files = {'photo': ('chart.png', photo)}
+            return self.session.post(url, data=data, files=files, timeout=REQUEST_TIMEOUT)
+        data['text'] = item['text']
+        if item['parse_mode']:
+            data['parse_mode'] = item['parse_mode']
+        return self.session.post(url, json=data, timeout=REQUEST_TIMEOUT)
+
+    def deliver(self, item):
+        """
+        Sends one item. Returns True when it is done with (delivered or permanently
+        rejected), False when it should stay queued.
+        """
+        if item.get('photo_file') and not os.path.exists(item['photo_file']):
+            print(f"Telegram photo {item['photo_file']} is missing, dropping it")
+            return True
+        for attempt in range(MAX_ATTEMPTS):
+            self.limiter(item['chat_id']).acquire()
+            self.global_limiter.acquire()
+            try:
+                response = self.post(item)
+                body = response.json() if response.content else {}
+            except Exception as e:
+                print(f"Telegram request failed (attempt {attempt + 1}/{MAX_ATTEMPTS}): {e}")
+                time.sleep(BACKOFF_SECONDS * 2 ** attempt)
+                continue
+
+            if response.ok:
+                return True
+            if response.status_code == 429:
+                retry_after = body.get('parameters', {}).get('retry_after', BACKOFF_SECONDS)
+                print(f"Telegram rate limit hit, retrying after {retry_after}s")
+                self.limiter(item['chat_id']).pause(retry_after)
+                continue
+            if response.status_code == 400 and item.get('parse_mode'):
+                # Usually Markdown that does not parse (e.g. cut by splitting): send as plain text.
+                print(f"Telegram rejected formatting ({body.get('description')}), resending as plain text")
+                item['parse_mode'] = None
+                continue
+            if 400 <= response.status_code < 500:
+                print(f"Telegram rejected message, dropping it: {response.status_code} {body.get('description')}")
+                return True
+            print(f"Telegram error {response.status_code}, retrying")
+            time.sleep(BACKOFF_SECONDS * 2 ** attempt)
+        return False
+
+    def flush(self):
+        """
+        Delivers the queue in order. Stops at the first item that cannot be delivered, so
+        order is kept and the rest is retried later. Returns the number of items left.
+        """
+        with self.flush_lock:
+            sent = 0
+            while True:
+                with self.lock:
+                    if not self.queue:
+                        break
+                    item, taken = self.next_batch()
+                if not self.deliver(item):
+                    break
+                with self.lock:
+                    self.remove_photos(self.queue[:taken])
+                    del self.queue[:taken]  # senders only append, so the head is unchanged
+                    self.append_log([{'done': taken}])
+                sent += 1
+            with self.lock:
+                self.compact()
+            if sent:
+                print(f"Telegram: sent {sent} messages, {len(self.queue)} queued")
+            return len(self.queue)
+
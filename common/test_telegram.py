@@ -0,0 +1,63 @@
+import json
+import pytest
+from common.telegram import TelegramSender, parse_chat_id
+
+
+@pytest.mark.parametrize("chat_id, expected", [
+    ("-1001234567890_42", ("-1001234567890", "42")),
+    ("-1001234567890", ("-1001234567890", None)),
+    ("@my_channel", ("@my_channel", None)),
+    ("@my_channel_7", ("@my_channel", "7")),
+    (123456, ("123456", None)),
+])
+def test_parse_chat_id(chat_id, expected):
+    assert parse_chat_id(chat_id) == expected
+
+
+class FakeResponse:
+    ok = True
+    status_code = 200
+    content = b"{}"
+
+    def json(self):
+        return {}
+
+
+class NoLimit:
+    def acquire(self):
+        pass
+
+
+def sender(path):
+    """
+    A sender whose requests are recorded instead of posted, without rate limits.
+    """
+    telegram = TelegramSender("token", "-100123", queue_file=path, coalesce=False)
+    telegram.posted = []
+    telegram.post = lambda item: telegram.posted.append(item) or FakeResponse()
+    telegram.limiter = lambda chat: NoLimit()
+    telegram.global_limiter = NoLimit()
+    return telegram
+
+
+def test_queue_is_an_append_log_with_photos_on_disk(tmp_path):
+    path = str(tmp_path / "telegram_queue.jsonl")
+    first = sender(path)
+    for i in range(50):
+        first.send_message(f"message {i}")
+    first.send_photo(b"\x89PNG fake", caption="chart")
+    with open(path) as f:
+        lines = f.readlines()
+    assert len(lines) == 51 and all(len(line) < 400 for line in lines)
+    assert json.loads(lines[-1])['add']['photo_file'].startswith(path + ".photos")
+
+    # Delivery is logged as it goes; a restart only sees what is still undelivered
+    deliver = first.deliver
+    first.deliver = lambda item: len(first.posted) < 10 and deliver(item)
+    assert first.flush() == 41
+    second = sender(path)
+    assert [item['text'] for item in second.queue[:1]] == ["message 10"]
+    assert len(second.queue) == 41
+    assert second.flush() == 0
+    assert second.posted[-1]['caption'] == "chart"
+    assert sorted(p.name for p in tmp_path.iterdir()) == []
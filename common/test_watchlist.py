@@ -0,0 +1,35 @@
+import os
+from common.watchlist import FileSource, WatchlistProvider
+
+
+def write(path, symbols, mtime):
+    with open(path, "w") as f:
+        f.write("\n".join(["Symbol"] + symbols) + "\n")
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_poll_reports_added_and_removed(tmp_path):
+    path = str(tmp_path / "watchlist.csv")
+    write(path, ["aapl", "MSFT ", "", "nvda"], 1)
+    watchlist = WatchlistProvider(FileSource(path), ttl=3600)
+    assert watchlist.poll() == (["AAPL", "MSFT", "NVDA"], ["AAPL", "MSFT", "NVDA"], [])
+
+    # Within the TTL the file is not re-read
+    write(path, ["AAPL", "TSLA"], 2)
+    assert watchlist.poll() == (["AAPL", "MSFT", "NVDA"], [], [])
+
+    assert watchlist.poll(force=True) == (["AAPL", "TSLA"], ["TSLA"], ["MSFT", "NVDA"])
+    assert watchlist.poll(force=True) == (["AAPL", "TSLA"], [], [])
+
+    # A touched but unchanged file is not a change
+    write(path, ["AAPL", "TSLA"], 3)
+    assert watchlist.poll(force=True) == (["AAPL", "TSLA"], [], [])
+
+
+def test_unreadable_source_keeps_the_last_list(tmp_path):
+    path = str(tmp_path / "watchlist.csv")
+    write(path, ["AAPL,Apple", "MSFT,Microsoft"], 1)
+    watchlist = WatchlistProvider(FileSource(path), ttl=0)
+    assert watchlist.symbols() == ["AAPL", "MSFT"]
+    os.remove(path)
+    assert watchlist.poll() == (["AAPL", "MSFT"], [], [])
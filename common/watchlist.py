@@ -0,0 +1,122 @@
+import hashlib
+import os
+import threading
+import time
+
+# === CONFIGURATION ===
+GOOGLE_SHEET_NAME = "Stock_Watchlist"
+GOOGLE_CREDENTIALS_FILE = "your-service-account.json"
+GOOGLE_SCOPE = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
+WATCHLIST_TTL = 300  # seconds the symbol list is served from memory
+# Point this at a text/CSV file (first column, header row) to run without Google Sheets.
+WATCHLIST_FILE = os.getenv('WATCHLIST_FILE')
+
+
+def clean_symbols(values):
+    """
+    First-column values without the header row, stripped and upper-cased.
+    """
+    return [s.strip().upper() for s in values[1:] if s.strip()]
+
+
+class GoogleSheetSource:
+    """
+    Reads the first column of a sheet. The authorized client and worksheet are kept alive
+    between reads, and re-created once if a call fails (e.g. expired token).
+    """
+
+    def __init__(self, credentials_file=GOOGLE_CREDENTIALS_FILE, sheet_name=GOOGLE_SHEET_NAME):
+        self.credentials_file = credentials_file
+        self.sheet_name = sheet_name
+        self.spreadsheet = None
+
+    def connect(self):
+        import gspread
+        from oauth2client.service_account import ServiceAccountCredentials
+        creds = ServiceAccountCredentials.from_json_keyfile_name(self.credentials_file, GOOGLE_SCOPE)
+        client = gspread.authorize(creds)
+        self.spreadsheet = client.open(self.sheet_name)
+
+    def call(self, func):
+        if self.spreadsheet is None:
+            self.connect()
+        try:
+            return func(self.spreadsheet)
+        except Exception:
+            self.connect()
+            return func(self.spreadsheet)
+
+    def version(self):
+        """
+        Drive modifiedTime of the spreadsheet; a cheap check before re-reading the column.
+        """
+        return self.call(lambda s: s.get_lastUpdateTime() if hasattr(s, 'get_lastUpdateTime') else None)
+
+    def read(self):
+        return clean_symbols(self.call(lambda s: s.sheet1.col_values(1)))
+
+
+class FileSource:
+    """
+    File-backed stand-in for the sheet: one symbol per line (or CSV, first column), header first.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def version(self):
+        return os.stat(self.path).st_mtime_ns
+
+    def read(self):
+        with open(self.path) as f:
+            return clean_symbols([line.split(',')[0] for line in f.read().splitlines()])
+
+
+class WatchlistProvider:
+    """
+    Cached watchlist with change detection. poll() returns (symbols, added, removed) so
+    long-running loops can update their per-symbol state incrementally.
+    """
+
+    def __init__(self, source, ttl=WATCHLIST_TTL):
+        self.source = source
+        self.ttl = ttl
+        self.current = []
+        self.version = None
+        self.checksum = None
+        self.checked_at = 0
+        self.lock = threading.Lock()
+
+    def poll(self, force=False):
+        with self.lock:
+            previous = self.current
+            if force or time.time() - self.checked_at >= self.ttl or self.checksum is None:
+                self.refresh()
+            before, after = set(previous), set(self.current)
+            added = [s for s in self.current if s not in before]
+            removed = [s for s in previous if s not in after]
+            return list(self.current), added, removed
+
+    def refresh(self):
+        try:
+            version = self.source.version()
+            if version is None or version != self.version or self.checksum is None:
+                symbols = self.source.read()
+                checksum = hashlib.sha1("\n".join(symbols).encode()).hexdigest()
+                if checksum != self.checksum:
+                    print(f"Watchlist changed: {len(symbols)} symbols")
+                    self.current = symbols
+                    self.checksum = checksum
+                self.version = version
+        except Exception as e:
+            print(f"Error loading watchlist, keeping the last known list: {e}")
+        self.checked_at = time.time()
+
+    def symbols(self):
+        return self.poll()[0]
+
+
+def default_watchlist(credentials_file=GOOGLE_CREDENTIALS_FILE, sheet_name=GOOGLE_SHEET_NAME,
+                      ttl=WATCHLIST_TTL):
+    source = FileSource(WATCHLIST_FILE) if WATCHLIST_FILE else GoogleSheetSource(credentials_file, sheet_name)
+    return WatchlistProvider(source, ttl)
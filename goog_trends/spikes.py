@@ -0,0 +1,93 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+
+# === CONFIGURATION ===
+BASELINE_WINDOW = 26  # points (weeks for a 5-year timeframe) in each keyword's rolling baseline
+MIN_PERIODS = 8  # points needed before a baseline counts
+Z_THRESHOLD = 3.0  # standard deviations above the baseline that make a spike
+MAX_ANNOTATIONS = 8  # dated labels drawn on the chart, the strongest spikes first
+MIN_LABEL_GAP = pd.Timedelta(days=60)  # per keyword, so labels of one episode do not overlap
+STATE_FILE = "trend_spikes.json"  # last evaluated date per keyword
+
+
+def rolling_zscores(df, window=BASELINE_WINDOW, min_periods=MIN_PERIODS):
+    """
+    Each point's z-score against the mean and std of the `window` points before it,
+    for all keywords at once. NaN until the baseline has `min_periods` points or while it is flat.
+    """
+    past = df.shift(1).rolling(window, min_periods=min_periods)
+    std = past.std().replace(0, np.nan)
+    return (df - past.mean()) / std
+
+
+def detect_spikes(df, threshold=Z_THRESHOLD, window=BASELINE_WINDOW):
+    """
+    Returns (z-scores, boolean spike mask), both dates x keywords.
+    """
+    z = rolling_zscores(df, window)
+    return z, z >= threshold
+
+
+def spike_list(df, z, mask):
+    """
+    Spikes as a DataFrame of date, keyword, value and z, oldest first.
+    """
+    spikes = mask.stack()
+    spikes = spikes[spikes].index
+    out = pd.DataFrame({'date': spikes.get_level_values(0), 'keyword': spikes.get_level_values(1)})
+    out['value'] = [df.at[d, k] for d, k in spikes]
+    out['z'] = [z.at[d, k] for d, k in spikes]
+    return out.sort_values(['date', 'keyword']).reset_index(drop=True)
+
+
+def select_annotations(spikes, limit=MAX_ANNOTATIONS, min_gap=MIN_LABEL_GAP):
+    """
+    At most `limit` spikes to label: strongest first, skipping spikes within `min_gap`
+    of an already labelled spike of the same keyword.
+    """
+    chosen = []
+    for row in spikes.sort_values('z', ascending=False).itertuples(index=False):
+        if len(chosen) == limit:
+            break
+        if all(c.keyword != row.keyword or abs(c.date - row.date) >= min_gap for c in chosen):
+            chosen.append(row)
+    return pd.DataFrame(chosen, columns=spikes.columns)
+
+
+# === INCREMENTAL ALERTING ===
+def load_state(path=STATE_FILE):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"⚠️ Could not load spike state from {path}: {e}")
+        return {}
+
+
+def save_state(state, path=STATE_FILE):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+def new_spikes(spikes, df, until=None, path=STATE_FILE):
+    """
+    Spikes dated after each keyword's last evaluated date and up to `until` (the last complete
+    point; default the end of df), then advances those dates to `until`. A partial period is
+    left for a later run so a spike that builds up during it is still alerted once complete.
+    A keyword seen for the first time only counts its latest complete point as new.
+    """
+    state = load_state(path)
+    until = df.index[-1] if until is None else pd.Timestamp(until)
+    done = df.index[df.index <= until]
+    first_run = done[-2] if len(done) > 1 else pd.Timestamp.min
+    since = {k: pd.Timestamp(state[k]) if k in state else first_run for k in df.columns}
+    fresh = spikes[[since[k] < d <= until for d, k in zip(spikes['date'], spikes['keyword'])]]
+    state.update({k: until.isoformat() for k in df.columns})
+    save_state(state, path)
+    return fresh.reset_index(drop=True)
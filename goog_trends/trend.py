@@ -1,11 +1,13 @@
 import os
-import requests
+import sys
 import matplotlib.pyplot as plt
-import pandas as pd
-from pytrends.request import TrendReq
 from dotenv import load_dotenv
-import time
-from pytrends.exceptions import TooManyRequestsError
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.charts import render_many
+from common.telegram import TelegramSender
+from trends_fetcher import TrendsFetcher
+from spikes import BASELINE_WINDOW, Z_THRESHOLD, detect_spikes, new_spikes, select_annotations, spike_list
 
 
 # === LOAD TELEGRAM CREDENTIALS ===
@@ -13,79 +15,65 @@ load_dotenv()
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
 
-# === TELEGRAM SEND PHOTO FUNCTION ===
-def send_telegram_photo(photo_path, text):
-    url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendPhoto"
-    with open(photo_path, "rb") as photo_file:
-        files = {"photo": photo_file}
-        if "_" in TELEGRAM_CHAT_ID:
-            ids = TELEGRAM_CHAT_ID.split("_")
-            payload = {
-                "chat_id": ids[0],
-                "message_thread_id": ids[1],
-                "caption": text,
-            }
-        else:
-            payload = {
-                "chat_id": TELEGRAM_CHAT_ID,
-                "caption": text,
-            }
-
-        response = requests.post(url, data=payload, files=files)
-        print(response.json())
-
-
-def safe_interest_over_time(pytrends, retries=5, sleep_time=60):
-    for attempt in range(retries):
-        try:
-            return pytrends.interest_over_time()
-        except TooManyRequestsError:
-            wait = sleep_time * (attempt + 1)
-            print(f"⚠️ Rate limited by Google. Waiting {wait}s before retrying...")
-            time.sleep(wait)
-        except Exception as e:
-            print(f"⚠️ Unexpected error: {e}")
-            time.sleep(10)
-    print("❌ Failed after multiple retries.")
-    return pd.DataFrame()
+# === TELEGRAM DELIVERY (queued, rate limited, see common/telegram.py) ===
+telegram = TelegramSender(TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID)
+
+
+# === GOOGLE TRENDS (batched beyond 5 keywords, cached, see trends_fetcher.py) ===
+TIMEFRAME = "today 5-y"
+GEO = ""  # worldwide
+ANCHOR = None  # shared term that ties batches together; defaults to the first keyword
 
 
 # === GOOGLE TRENDS FETCH & PLOT ===
-def fetch_and_plot_trends(keywords, spike_threshold=40):
+def fetch_and_plot_trends(keywords, z_threshold=Z_THRESHOLD, anchor=ANCHOR):
+    """
+    Returns (chart png, spikes since the last run) or (None, None) without data.
+    """
     print(f"📊 Fetching Google Trends data for: {', '.join(keywords)}")
 
-    pytrends = TrendReq(hl="en-US", tz=360)
-    pytrends.build_payload(
-        kw_list=keywords,
-        timeframe="today 5-y",
-        geo="",     # worldwide
-        gprop="",   # web search
-    )
-
-    df = safe_interest_over_time(pytrends)
+    fetcher = TrendsFetcher(anchor or keywords[0], timeframe=TIMEFRAME, geo=GEO)
+    df = fetcher.interest_over_time(keywords)
     if df.empty:
         print("⚠️ No data found.")
-        return None
+        return None, None
+
+    partial = df.pop('isPartial') if 'isPartial' in df else None
+    complete = df.index[~partial.to_numpy(dtype=bool)] if partial is not None else df.index
+    if complete.empty:
+        print("⚠️ No complete period yet.")
+        return None, None
 
-    # === PLOT ===
-    save_path = "google_trends_comparison_spikes.png"
-    plt.figure(figsize=(12, 6))
+    z, mask = detect_spikes(df, z_threshold)
+    spikes = spike_list(df, z, mask)
+    fresh = new_spikes(spikes, df, until=complete[-1])
+    print(f"🔺 {len(spikes)} spikes, {len(fresh)} new")
+
+    png, _ = render_many([(trends_chart, (df, keywords, mask, select_annotations(spikes)),
+                           {'savefig_kwargs': {'dpi': 300, 'bbox_inches': 'tight'}})])[0]
+    return png, fresh
+
+
+# === PLOT ===
+def trends_chart(df, keywords, mask, labels):
+    fig = plt.figure(figsize=(12, 6))
     colors = ["#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd"]
+    color_of = {}
 
-    for i, keyword in enumerate(keywords):
-        color = colors[i % len(colors)]
+    for i, keyword in enumerate(k for k in keywords if k in df.columns):
+        color = color_of[keyword] = colors[i % len(colors)]
         plt.plot(df.index, df[keyword], color=color, linewidth=2.2, label=keyword.title())
 
-        # Find spike points
-        spikes = df[df[keyword] >= spike_threshold]
-        plt.scatter(spikes.index, spikes[keyword], color=color, s=60, edgecolors='black', zorder=5)
+        # Spike points (one scatter per keyword)
+        spikes = df.loc[mask[keyword], keyword]
+        plt.scatter(spikes.index, spikes, color=color, s=60, edgecolors='black', zorder=5)
 
-        # Annotate dates for each spike
-        for x, y in zip(spikes.index, spikes[keyword]):
-            plt.text(
-                x, y + 2, x.strftime("%Y-%m-%d"),
-                fontsize=8, color=color, ha="center", rotation=45
-            )
+    # Date labels for the strongest spikes only (bounded count, see spikes.py)
+    for row in labels.itertuples(index=False):
+        plt.text(
+            row.date, row.value + 2, row.date.strftime("%Y-%m-%d"),
+            fontsize=8, color=color_of.get(row.keyword, "black"), ha="center", rotation=45
+        )
 
     # === STYLING ===
     plt.title(f"Google Trends: {', '.join(keywords)} (Worldwide, Web Search, Past 5 Years)",
@@ -95,21 +83,22 @@ def fetch_and_plot_trends(keywords, spike_threshold=40):
     plt.grid(True, linestyle="--", alpha=0.4)
     plt.legend(frameon=False)
     plt.tight_layout()
-    plt.savefig(save_path, dpi=300, bbox_inches="tight")
-    plt.close()
-
-    print(f"✅ Chart saved to {save_path}")
-    return save_path
+    return fig
 
 
 # === MAIN EXECUTION ===
 if __name__ == "__main__":
     keywords = ["stock market crash", "bear market"]
-    photo_path = fetch_and_plot_trends(keywords, spike_threshold=40)
-    if photo_path:
+    png, fresh = fetch_and_plot_trends(keywords)
+    if png:
         caption = (
             "📈 Google Trends (Worldwide, Web Search, Past 5 Years)\n"
             + "\n".join([f"• {kw.title()}" for kw in keywords])
-            + "\n\n🔺 Spikes marked where interest ≥ 40"
+            + f"\n\n🔺 Spikes marked where interest is ≥ {Z_THRESHOLD:g}σ above its {BASELINE_WINDOW}-week baseline"
         )
-        send_telegram_photo(photo_path, caption)
+        telegram.send_photo(png, caption)
+    if fresh is not None and not fresh.empty:
+        lines = [f"• {row.keyword.title()}: {row.value:.0f} on {row.date.strftime('%Y-%m-%d')} (z={row.z:.1f})"
+                 for row in fresh.itertuples(index=False)]
+        telegram.send_message("🚨 New Google Trends spikes\n" + "\n".join(lines), parse_mode=None)
+    telegram.flush()
@@ -0,0 +1,154 @@
+import hashlib
+import json
+import os
+import random
+import time
+import pandas as pd
+from pytrends.request import TrendReq
+from pytrends.exceptions import TooManyRequestsError
+
+# === CONFIGURATION ===
+MAX_TERMS = 5  # Google Trends compares at most 5 terms per request
+CACHE_DIR = "trends_cache"
+CACHE_TTL = 12 * 60 * 60  # seconds a cached keyword series is reused
+MAX_RETRIES = 6
+BACKOFF_BASE = 30  # seconds, doubled on every retry
+BACKOFF_MAX = 10 * 60
+MIN_ANCHOR_PEAK = 10  # below this the anchor is too coarse (integers 0-100) to rescale a batch well
+
+
+def backoff_delay(attempt, base=BACKOFF_BASE, cap=BACKOFF_MAX):
+    """
+    Exponential backoff with jitter: a random wait between half and all of min(cap, base * 2^attempt),
+    so parallel jobs that were rate limited together do not retry together.
+    """
+    delay = min(cap, base * 2 ** attempt)
+    return random.uniform(delay / 2, delay)
+
+
+class TrendsFetcher:
+    """
+    Google Trends interest over time for any number of keywords.
+
+    Keywords are requested in batches of MAX_TERMS - 1 plus a shared anchor term. Google scales
+    each batch to its own 0-100, so every series is stored in anchor units (divided by the
+    anchor's mean in the same batch), which makes batches comparable. The combined result is
+    scaled back to 0-100 over all requested keywords, which equals Google's own scale when
+    everything fits in one request.
+    Each keyword's series is cached on disk per (keyword, anchor, timeframe, geo) for `ttl`
+    seconds; the anchor is part of the key because the stored values are relative to it.
+    """
+
+    def __init__(self, anchor, timeframe="today 5-y", geo="", cache_dir=CACHE_DIR, ttl=CACHE_TTL,
+                 client_factory=lambda: TrendReq(hl="en-US", tz=360), sleep=time.sleep):
+        self.anchor = anchor
+        self.timeframe = timeframe
+        self.geo = geo
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.client_factory = client_factory
+        self.sleep = sleep
+        self.client = None  # created on the first request (it fetches Google cookies)
+        self.partial = set()  # dates Google flagged isPartial (the current, incomplete period)
+        self.requests = 0
+
+    # --- cache ---
+    def cache_path(self, keyword):
+        key = json.dumps([keyword, self.anchor, self.timeframe, self.geo])
+        return os.path.join(self.cache_dir, hashlib.sha1(key.encode()).hexdigest() + ".json")
+
+    def read_cache(self, keyword):
+        path = self.cache_path(keyword)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            if time.time() - data['fetched_at'] > self.ttl:
+                return None
+            self.partial.update(pd.to_datetime(data.get('partial', [])))
+            return pd.Series(data['values'], index=pd.to_datetime(data['dates']), name=keyword)
+        except Exception as e:
+            print(f"⚠️ Ignoring unreadable cache entry for '{keyword}': {e}")
+            return None
+
+    def write_cache(self, series, partial=()):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.cache_path(series.name)
+        data = {'keyword': series.name, 'anchor': self.anchor, 'timeframe': self.timeframe, 'geo': self.geo,
+                'fetched_at': time.time(), 'dates': series.index.strftime("%Y-%m-%d %H:%M:%S").tolist(),
+                'values': series.tolist(), 'partial': [d.strftime("%Y-%m-%d %H:%M:%S") for d in partial]}
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+
+    # --- requests ---
+    def request(self, terms):
+        """
+        One interest_over_time request, retried with jittered exponential backoff.
+        """
+        for attempt in range(MAX_RETRIES):
+            try:
+                if self.client is None:
+                    self.client = self.client_factory()
+                self.requests += 1
+                self.client.build_payload(kw_list=terms, timeframe=self.timeframe, geo=self.geo, gprop="")
+                return self.client.interest_over_time()
+            except TooManyRequestsError:
+                wait = backoff_delay(attempt)
+                print(f"⚠️ Rate limited by Google. Waiting {wait:.0f}s before retrying...")
+            except Exception as e:
+                wait = backoff_delay(attempt)
+                print(f"⚠️ Unexpected error: {e}. Waiting {wait:.0f}s before retrying...")
+            self.sleep(wait)
+        print(f"❌ Failed after {MAX_RETRIES} retries: {', '.join(terms)}")
+        return pd.DataFrame()
+
+    def fetch_batch(self, keywords):
+        """
+        Fetches keywords together with the anchor and caches each series in anchor units.
+        """
+        df = self.request([self.anchor] + keywords)
+        if df.empty:
+            return
+        anchor = df[self.anchor].astype(float)
+        if anchor.mean() == 0:
+            print(f"⚠️ Anchor '{self.anchor}' has no interest next to {', '.join(keywords)}; skipping batch")
+            return
+        if anchor.max() < MIN_ANCHOR_PEAK:
+            print(f"⚠️ Anchor '{self.anchor}' peaks at {anchor.max():.0f} in this batch; "
+                  f"rescaling of {', '.join(keywords)} is coarse (pick a more popular anchor)")
+        partial = df.index[df['isPartial'].astype(str) == 'True'] if 'isPartial' in df else []
+        self.partial.update(partial)
+        for term in [self.anchor] + keywords:
+            self.write_cache((df[term].astype(float) / anchor.mean()).rename(term), partial)
+
+    def interest_over_time(self, keywords):
+        """
+        Interest over time (dates x keywords, 0-100 over all keywords, plus pytrends' isPartial
+        column), like pytrends' interest_over_time() without the 5-term limit. Cached keywords
+        cost no request.
+        """
+        series = {kw: self.read_cache(kw) for kw in keywords}
+        missing = [kw for kw in dict.fromkeys(keywords) if series[kw] is None and kw != self.anchor]
+        batch_size = MAX_TERMS - 1
+        for i in range(0, len(missing), batch_size):
+            self.fetch_batch(missing[i:i + batch_size])
+        if self.anchor in series and series[self.anchor] is None and not missing:
+            self.fetch_batch([])
+        series = {kw: s if s is not None else self.read_cache(kw) for kw, s in series.items()}
+
+        failed = [kw for kw, s in series.items() if s is None]
+        if failed:
+            print(f"⚠️ No data for: {', '.join(failed)}")
+        found = {kw: s for kw, s in series.items() if s is not None}
+        if not found:
+            return pd.DataFrame()
+        df = pd.DataFrame(found)
+        peak = df.max().max()
+        if peak > 0:
+            df = df / peak * 100
+        df['isPartial'] = df.index.isin(list(self.partial))
+        print(f"📡 Google Trends: {len(found)} keywords, {self.requests} requests")
+        return df.rename_axis("date")
@@ -0,0 +1,73 @@
+#Benchmark: OpenInsider tinytable parser vs pd.read_html on saved screener pages
+
+import glob
+import io
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+from utils import INSIDER_COLUMNS, parse_insider_table
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "*.html")
+RUNS = 20
+
+
+def read_html_analysis(html):
+    """
+    The previous insider_analysis path: pd.read_html over every table, then the Ticker lookup
+    and the Filing Date / Qty conversions.
+    """
+    for table in pd.read_html(io.StringIO(html)):
+        cols = [str(c).strip() for c in table.columns]
+        if any("Ticker" in c for c in cols):
+            df = table.copy()
+            df.columns = cols
+            break
+    else:
+        return None
+    df['Filing\xa0Date'] = pd.to_datetime(df['Filing\xa0Date'], errors="coerce")
+    df['Qty'] = df['Qty'].replace(r'[\$,]', '', regex=True).astype(float)
+    return df[INSIDER_COLUMNS]
+
+
+def scaled(html, factor):
+    """
+    The same page with its table rows repeated `factor` times.
+    """
+    head, rest = html.split("<tbody>", 1)
+    body, tail = rest.split("</tbody>", 1)
+    return head + "<tbody>" + body * factor + "</tbody>" + tail
+
+
+def timed(fn, runs=RUNS):
+    started = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return (time.perf_counter() - started) / runs * 1000
+
+
+def check_parity(html):
+    old = read_html_analysis(html)
+    new = parse_insider_table(html.encode(), INSIDER_COLUMNS)[INSIDER_COLUMNS]
+    assert old.shape == new.shape, (old.shape, new.shape)
+    assert (old.iloc[:, 0] == new.iloc[:, 0]).all()
+    assert (old['Ticker'] == new['Ticker']).all()
+    assert (old['Qty'] == new['Qty']).all()
+    assert np.allclose(old['Price'].str.replace(r'[\$,]', '', regex=True).astype(float), new['Price'])
+
+
+if __name__ == "__main__":
+    # python bench_parser.py [saved page ...]   (default: fixtures/*.html)
+    paths = sys.argv[1:] or sorted(glob.glob(FIXTURES))
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            page = f.read()
+        for factor in (1, 10):
+            html = scaled(page, factor)
+            check_parity(html)
+            rows = len(parse_insider_table(html.encode()))
+            old_ms = timed(lambda: read_html_analysis(html))
+            new_ms = timed(lambda: parse_insider_table(html.encode(), INSIDER_COLUMNS))
+            print(f"{os.path.basename(path)} x{factor} ({rows} rows): read_html {old_ms:.1f}ms, "
+                  f"tinytable parser {new_ms:.1f}ms ({old_ms / new_ms:.1f}x)")
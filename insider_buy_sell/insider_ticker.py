@@ -1,8 +1,7 @@
 #Get insider selling/buying
 
 import pandas as pd
-from utils import get_symbols_from_google_sheet, insider_analysis, send_telegram_message
-import time 
+from utils import get_symbols_from_google_sheet, insider_analysis, send_telegram_message, get_telegram
 
 
 
@@ -21,7 +20,8 @@ if __name__ == "__main__":
         if df is not None and not df.empty:
             all_dfs.append(df)
             send_telegram_message(f"**{ticker} insider activity the last {days} days** \n\n {df}")
-        time.sleep(2)
+
+    get_telegram().flush()
 
 #    if all_dfs:
 #        combined_df = pd.concat(all_dfs, ignore_index=True)
@@ -1,10 +1,16 @@
 from datetime import datetime, timedelta
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
 from dotenv import load_dotenv
+from lxml import etree
+import numpy as np
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
 import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from common.watchlist import default_watchlist
+from common.telegram import TelegramSender
 
 load_dotenv()
 
@@ -13,84 +19,114 @@ GOOGLE_SHEET_NAME = "Stock_Watchlist"
 GOOGLE_CREDENTIALS_FILE = "your-service-account.json"
 TELEGRAM_BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN')
 TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
+REQUEST_TIMEOUT = (10, 30)  # connect, read seconds
+INSIDER_COLUMNS = ['Filing\xa0Date', 'Filing\xa0Date', 'Ticker', 'Insider\xa0Name', 'Title', 'Trade\xa0Type',
+                   'Price', 'Qty', 'ΔOwn']
+
+
+watchlist = default_watchlist(GOOGLE_CREDENTIALS_FILE, GOOGLE_SHEET_NAME)
+telegram = None  # created on first use, so importing the parser (e.g. bench_parser.py) never touches the queue
+
+# === HTTP SESSION (pooled connections to openinsider.com across the per-ticker requests) ===
+session = requests.Session()
+session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+session.headers["User-Agent"] = "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
 
 
 def get_symbols_from_google_sheet():
     """
-    Authenticates with Google Sheets using a service account and
-    fetches stock symbols from the first column of the specified sheet.
+    Stock symbols from the first column of the watchlist sheet (cached, see common/watchlist.py).
     """
+    return watchlist.symbols()
+
+
+HTML_PARSER = etree.HTMLParser()  # plain lxml elements: much cheaper per cell than lxml.html's
+
+
+def parse_number(text):
+    """
+    '$1,234.50', '-1,234', '+12%' or '>999%' as a float; 'New' (a new position) is inf, blanks are NaN.
+    """
+    text = text.replace('$', '').replace(',', '').replace('%', '').replace('+', '').lstrip('<>')
+    if text == 'New':
+        return np.inf
     try:
-        scope = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
-        creds = ServiceAccountCredentials.from_json_keyfile_name(GOOGLE_CREDENTIALS_FILE, scope)
-        client = gspread.authorize(creds)
-        sheet = client.open(GOOGLE_SHEET_NAME).sheet1
-        symbols = sheet.col_values(1)[1:] # Skip header row
-        return [s.strip().upper() for s in symbols if s.strip()]
-    except Exception as e:
-        print(f"Error loading symbols from Google Sheet: {e}")
-        return []
-    
+        return float(text)
+    except ValueError:
+        return np.nan
 
-def insider_analysis(url):
-    # Read all tables
-    tables = pd.read_html(url)
-
-    # Find the table with 'Ticker' column
-    insider_df = None
-    for table in tables:
-        cols = [str(c).strip() for c in table.columns]
-        if any("Ticker" in c for c in cols):
-            insider_df = table.copy()
-            insider_df.columns = cols  # clean column names
-            break
 
-    if insider_df is not None:
-        # Inspect columns
-        print("Columns found:", insider_df.columns.tolist())
+def parse_insider_table(html, columns=None):
+    """
+    The OpenInsider 'tinytable' as a DataFrame, or None if the page has none. Only the cells of
+    `columns` (default: all) are read, streamed straight into typed lists: dates as datetimes,
+    Price, Qty and ΔOwn as floats (ΔOwn in percent), the rest as text. Column names are as
+    pd.read_html gives them.
+    """
+    tree = etree.fromstring(html, HTML_PARSER)
+    if tree is None:  # empty body
+        return None
+    tables = tree.xpath('//table[contains(concat(" ", normalize-space(@class), " "), " tinytable ")]')
+    if not tables:
+        return None
+    table = tables[0]
+    header = [''.join(th.itertext()).strip() for th in table.xpath('./thead/tr[1]/th')]
+    wanted = [c for c in dict.fromkeys(columns or header) if c in header]
+    positions = [header.index(c) for c in wanted]
+    numeric = [any(k in c for k in ("Price", "Qty", "ΔOwn")) for c in wanted]
+    values = [[] for _ in wanted]
+    for tr in table.iterfind('tbody/tr'):
+        cells = tr.findall('td')
+        if len(cells) != len(header):
+            continue
+        for out, i, number in zip(values, positions, numeric):
+            text = ''.join(cells[i].itertext()).strip()
+            out.append(parse_number(text) if number else text)
+    df = pd.DataFrame(dict(zip(wanted, values)), columns=wanted)
+    for c in wanted:
+        if "Date" in c:
+            df[c] = pd.to_datetime(df[c], errors="coerce")
+    return df
 
-        # Try to detect the correct columns
-        filing_col = next((c for c in insider_df.columns if "Filing" in c), None)
-        trade_col = next((c for c in insider_df.columns if "Trade" in c), None)
-        ticker_col = next((c for c in insider_df.columns if "Ticker" in c), None)
-        qty_col = next((c for c in insider_df.columns if "Qty" in c), None)
 
-        # Convert dates
-        if filing_col:
-            insider_df[filing_col] = pd.to_datetime(insider_df[filing_col], errors="coerce")
-        if trade_col:
-            insider_df[trade_col] = pd.to_datetime(insider_df[trade_col], errors="coerce")
+def insider_analysis(url):
+    """
+    Insider trades from an OpenInsider screener URL: Filing Date (twice), Ticker, Insider Name,
+    Title, Trade Type, Price, Qty and ΔOwn. None if the page has no trade table.
+    """
+    try:
+        response = session.get(url, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+    except Exception as e:
+        print(f"Error fetching {url}: {e}")
+        return None
+    try:
+        insider_df = parse_insider_table(response.content, INSIDER_COLUMNS)
+    except Exception as e:
+        print(f"Error parsing {url}: {e}")
+        return None
 
-        # Clean Qty column
-        if qty_col:
-            insider_df[qty_col] = insider_df[qty_col].replace('[\$,]', '', regex=True).astype(float)
-            insider_df = insider_df[['Filing\xa0Date','Filing\xa0Date','Ticker','Insider\xa0Name','Title','Trade\xa0Type','Price','Qty','ΔOwn']]
+    if insider_df is not None:
+        print("Columns found:", insider_df.columns.tolist())
+        if all(c in insider_df.columns for c in INSIDER_COLUMNS):
+            insider_df = insider_df[INSIDER_COLUMNS]
 
         print(insider_df.head())
         return insider_df
     else:
         print("No insider trade table found.")
 
+def get_telegram():
+    global telegram
+    if telegram is None:
+        telegram = TelegramSender(TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID)
+    return telegram
+
+
 def send_telegram_message(text):
-    url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
-
-    chat_id = TELEGRAM_CHAT_ID
-
-    if "_" in chat_id:
-        ids = chat_id.split("_")
-        payload = {
-            "chat_id": ids[0],
-            "message_thread_id" : ids[1],
-            "text" : text,
-            "parse_mode" : "Markdown"
-        }
-    
-    else:
-        payload = {
-            "chat_id": chat_id,
-            "text": text,
-            "parse_mode": "Markdown"
-        }
-
-    requests.post(url, json=payload)
-    print("Message sent")
\ No newline at end of file
+    """
+    Queues a Markdown message. Delivery (coalesced, rate limited, split at 4096 characters)
+    happens on get_telegram().flush() or at exit, see common/telegram.py.
+    """
+    get_telegram().send_message(text)
\ No newline at end of file
@@ -0,0 +1,40 @@
+#Benchmark: compute_breadth on a synthetic panel (default 2000 tickers x 20 years x 5 windows x 3 universes)
+
+import sys
+import time
+import numpy as np
+import pandas as pd
+from breadth import compute_breadth
+
+WINDOWS = (10, 20, 50, 100, 200)
+RUNS = 5
+
+
+def synthetic_panel(n_dates, n_tickers, seed=0):
+    """
+    Random-walk closes; tickers list at random dates in the first half and 0.1% of closes are missing.
+    """
+    rng = np.random.default_rng(seed)
+    close = 50 * np.exp(np.cumsum(rng.normal(0, 0.02, (n_dates, n_tickers)), axis=0))
+    starts = rng.integers(0, n_dates // 2, n_tickers)
+    close[np.arange(n_dates)[:, None] < starts] = np.nan
+    close[rng.random(close.shape) < 0.001] = np.nan
+    tickers = [f"T{i:04d}" for i in range(n_tickers)]
+    return pd.DataFrame(close, index=pd.bdate_range("2005-01-03", periods=n_dates), columns=tickers)
+
+
+if __name__ == "__main__":
+    # python bench_breadth.py [tickers] [dates]
+    n_tickers = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    n_dates = int(sys.argv[2]) if len(sys.argv) > 2 else 5040
+    panel = synthetic_panel(n_dates, n_tickers)
+    tickers = list(panel.columns)
+    universes = {'all': tickers, 'half': tickers[::2], 'top100': tickers[:100]}
+    compute_breadth(panel, universes, WINDOWS)  # warm-up
+    seconds = []
+    for _ in range(RUNS):
+        started = time.perf_counter()
+        compute_breadth(panel, universes, WINDOWS)
+        seconds.append(time.perf_counter() - started)
+    print(f"{n_tickers} tickers x {n_dates} dates, {len(WINDOWS)} windows, {len(universes)} universes: "
+          f"median {np.median(seconds):.2f}s, best {min(seconds):.2f}s over {RUNS} runs")
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+
+# === CONFIGURATION ===
+DEFAULT_WINDOWS = (50, 200)
+
+
+def universe_matrix(universes, tickers):
+    """
+    Static universes (lists of tickers) as a tickers x universes 0/1 matrix, so the per-date
+    counts of every universe are one matrix product.
+    """
+    matrix = np.zeros((len(tickers), len(universes)), dtype=np.float32)
+    for k, members in enumerate(universes.values()):
+        matrix[:, k] = np.isin(tickers, list(members))
+    return matrix
+
+
+def compute_breadth(panel, universes, windows=DEFAULT_WINDOWS):
+    """
+    Percentage of each universe's members trading above their N-day moving average, per date.
+
+    panel: dates x tickers closes; universes: {name: list of tickers (static membership) or
+    boolean dates x tickers DataFrame (point-in-time membership)}.
+    All windows come from one float64 cumulative sum over the float32 panel, and the large
+    per-window arrays are allocated once and reused across windows. A mean is
+    defined like rolling(N).mean(): the last N rows all have a close. The denominator on each
+    date is the number of members with a defined MA then, so short histories neither count
+    nor dilute. Returns (universe, 'Above<N>%') columns; NaN where no member qualifies.
+    """
+    tickers = sorted({t for u in universes.values()
+                      for t in (u.columns if isinstance(u, pd.DataFrame) else u) if t in panel.columns})
+    close = panel.reindex(columns=tickers).to_numpy(dtype=np.float32)
+    n_dates = close.shape[0]
+    missing = np.isnan(close)
+
+    sums = np.zeros((n_dates + 1, len(tickers)))
+    np.copyto(sums[1:], close)
+    sums[1:][missing] = 0
+    np.cumsum(sums[1:], axis=0, out=sums[1:])
+    rows = np.arange(n_dates, dtype=np.int32)[:, None]
+    last_gap = np.where(missing, rows, np.int32(-1))  # index of the latest missing close
+    np.maximum.accumulate(last_gap, axis=0, out=last_gap)
+
+    static = {name: u for name, u in universes.items() if not isinstance(u, pd.DataFrame)}
+    masks = {name: u.reindex(index=panel.index, columns=tickers, fill_value=False).to_numpy(dtype=bool)
+             for name, u in universes.items() if isinstance(u, pd.DataFrame)}
+    matrix = universe_matrix(static, tickers)
+
+    counts = {(name, w): np.full(n_dates, np.nan) for name in universes for w in windows}
+    mean = np.empty(close.shape, dtype=np.float32)
+    defined_buf = np.empty(close.shape, dtype=bool)
+    above_buf = np.empty(close.shape, dtype=bool)
+    as_float = np.empty(close.shape, dtype=np.float32) if static else None  # matmul operand
+    for window in windows:
+        n = n_dates - window + 1
+        if n <= 0:
+            continue
+        m = mean[:n]
+        np.subtract(sums[window:], sums[:-window], out=m, casting='same_kind')
+        m /= np.float32(window)
+        # no missing close in the window
+        defined = np.less(last_gap[window - 1:], rows[:n], out=defined_buf[:n])
+        above = np.greater(close[window - 1:], m, out=above_buf[:n])
+        above &= defined
+        if static:
+            f = as_float[:n]
+            np.copyto(f, above)
+            above_counts = f @ matrix
+            np.copyto(f, defined)
+            defined_counts = f @ matrix
+            for k, name in enumerate(static):
+                counts[(name, window)][window - 1:] = ratio(above_counts[:, k], defined_counts[:, k])
+        for name, mask in masks.items():
+            member = mask[window - 1:]
+            counts[(name, window)][window - 1:] = ratio((above & member).sum(axis=1),
+                                                        (defined & member).sum(axis=1))
+
+    df = pd.DataFrame({(name, f"Above{w}%"): counts[(name, w)] for name in universes for w in windows},
+                      index=panel.index)
+    df.columns = pd.MultiIndex.from_tuples(df.columns)
+    return df
+
+
+def ratio(count, total):
+    count, total = np.asarray(count, dtype=float), np.asarray(total, dtype=float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(total > 0, count / total * 100, np.nan)
@@ -0,0 +1,331 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+import yfinance as yf
+from breadth import compute_breadth
+
+# === CONFIGURATION ===
+PANEL_FILE = "nasdaq100_closes.parquet"  # dates x tickers daily closes (auto-adjusted)
+STATE_FILE = "breadth_state.json"
+BREADTH_FILE = "nasdaq100_breadth.parquet"  # one breadth row per date
+MA_WINDOWS = (50, 200)
+HISTORY_YEARS = 6
+BENCHMARK = "^GSPC"
+STATE_VERSION = 2  # bumped when the state or breadth definition changes (forces a cold start)
+# Relative Close difference on the overlapping bar that means the history was re-adjusted
+# (split/dividend with auto_adjust=True), in which case the ticker is fetched in full again.
+ADJUSTMENT_TOLERANCE = 1e-4
+
+
+def download_closes(tickers, start, end):
+    """
+    Daily closes for [start, end) as a dates x tickers DataFrame.
+    """
+    data = yf.download(tickers, start=start.strftime("%Y-%m-%d"), end=end.strftime("%Y-%m-%d"),
+                       auto_adjust=True, progress=False)
+    if data.empty:
+        return pd.DataFrame()
+    close = data["Close"]
+    if isinstance(close, pd.Series):
+        close = close.to_frame(tickers[0])
+    return close.dropna(how="all")
+
+
+# === CLOSE PANEL ===
+class ClosePanel:
+    """
+    Persisted close-price panel. update() downloads only the bars after the last stored date
+    (one overlapping bar is re-downloaded to detect re-adjusted histories) plus the full
+    history of tickers not stored yet. A ticker missing from a delta fetch is re-requested
+    from its own last valid close on the next run.
+    """
+
+    def __init__(self, path=PANEL_FILE, fetcher=download_closes):
+        self.path = path
+        self.fetcher = fetcher
+        self.readjusted = set()  # tickers refetched in full by the last update()
+
+    def read(self):
+        if not os.path.exists(self.path):
+            return None
+        return pd.read_parquet(self.path)
+
+    def write(self, panel):
+        tmp = self.path + ".tmp"
+        panel.to_parquet(tmp)
+        os.replace(tmp, self.path)
+
+    def update(self, tickers, now=None):
+        now = pd.Timestamp(now if now is not None else pd.Timestamp.now()).normalize()
+        start = now - pd.DateOffset(years=HISTORY_YEARS)
+        end = now  # exclusive: only completed daily bars
+        panel = self.read()
+        self.readjusted = set()
+
+        if panel is None or panel.empty:
+            missing, stored = list(tickers), []
+            panel = pd.DataFrame()
+        else:
+            missing = [t for t in tickers if t not in panel.columns]
+            stored = [t for t in tickers if t in panel.columns]
+
+        if stored:
+            last = panel.index[-1]
+            # A ticker that failed in an earlier delta fetch has NaN closes after its own last
+            # valid date; it is re-requested from there instead of being left with the gap.
+            last_valid = panel[stored].apply(lambda c: c.last_valid_index())
+            missing += [t for t in stored if pd.isna(last_valid[t])]
+            stored = [t for t in stored if pd.notna(last_valid[t])]
+            lagging = [t for t in stored if last_valid[t] < last]
+            blocks = []
+            for group, since in (([t for t in stored if t not in lagging], last),
+                                 (lagging, min((last_valid[t] for t in lagging), default=last))):
+                if not group:
+                    continue
+                try:
+                    blocks.append(self.fetcher(group, since, end))
+                except Exception as e:
+                    print(f"Close panel delta fetch failed, using stored closes: {e}")
+            new = pd.concat(blocks, axis=1, sort=True) if blocks else pd.DataFrame()
+            if not new.empty:
+                for t in new.columns:
+                    day = last_valid.get(t)
+                    if day in new.index and pd.notna(new.at[day, t]):
+                        before, after = panel.at[day, t], new.at[day, t]
+                        if abs(after - before) > ADJUSTMENT_TOLERANCE * abs(before):
+                            self.readjusted.add(t)
+                # Lagging tickers that got their gap filled changed history the breadth state
+                # already consumed, so they are refetched and re-seeded like re-adjusted ones.
+                self.readjusted |= {t for t in lagging if t in new.columns
+                                    and new.loc[new.index > last_valid[t], t].notna().any()}
+                new = new[new.index > last].reindex(columns=panel.columns).dropna(how="all")
+                panel = pd.concat([panel, new])
+            if lagging:
+                print(f"Close panel: {len(lagging)} tickers behind the last date: {', '.join(lagging)}")
+        refetch = missing + sorted(self.readjusted)
+        if refetch:
+            print(f"Close panel: fetching full history for {len(refetch)} tickers")
+            try:
+                full = self.fetcher(refetch, start, end)
+            except Exception as e:
+                print(f"Close panel full fetch failed: {e}")
+                full = pd.DataFrame()
+            if not full.empty:
+                panel = panel.drop(columns=[t for t in full.columns if t in panel.columns])
+                panel = panel.join(full, how="outer") if not panel.empty else full
+            self.readjusted &= set(full.columns)
+
+        panel = panel.sort_index()
+        panel = panel[panel.index >= start]
+        self.write(panel)
+        return panel
+
+
+# === INCREMENTAL BREADTH ===
+class BreadthState:
+    """
+    Streaming 'close above its N-day MA' state for a set of tickers, vectorized across tickers.
+    Keeps the last max(windows) closes per ticker in a ring buffer with running sums, so each
+    new date is O(tickers x windows). An MA is defined like rolling(N).mean(): N rows with no
+    missing close.
+    """
+
+    def __init__(self, tickers, windows=MA_WINDOWS):
+        self.tickers = list(tickers)
+        self.windows = tuple(windows)
+        self.size = max(self.windows)
+        n = len(self.tickers)
+        self.buffer = np.full((self.size, n), np.nan)
+        self.sums = np.zeros((len(self.windows), n))
+        self.nans = np.zeros((len(self.windows), n), dtype=int)  # missing closes in each window
+        self.rows = np.zeros(n, dtype=int)  # rows seen per ticker, capped at the buffer size
+        self.pos = 0
+        self.last_date = None
+
+    @classmethod
+    def seed(cls, panel, tickers, windows=MA_WINDOWS, end_pos=0, membership=None):
+        """
+        Cold start: replays the panel's history. Returns the state and its breadth rows.
+        The replay is laid out so the ring buffer ends at `end_pos` (to merge with another state).
+        """
+        state = cls(tickers, windows)
+        state.pos = (end_pos - len(panel)) % state.size
+        rows = state.replay(panel, membership)
+        return state, rows
+
+    def replay(self, panel, membership=None):
+        """
+        Feeds panel rows through update(). `membership(date)` -> set of tickers counted on
+        that date (point-in-time index membership); None counts every tracked ticker.
+        """
+        values = panel.reindex(columns=self.tickers).to_numpy(dtype=float)
+        rows = []
+        for date, closes in zip(panel.index, values):
+            members = None if membership is None else np.isin(self.tickers, list(membership(date)))
+            rows.append(self.update(date, closes, members))
+        return rows
+
+    def update(self, date, closes, members=None):
+        """
+        Advances by one date (closes aligned with self.tickers). Returns
+        (date, {window: members above their MA}, {window: members with a defined MA}).
+        """
+        closes = np.asarray(closes, dtype=np.float32).astype(float)  # same precision as breadth.py
+        missing = np.isnan(closes)
+        counts, totals = {}, {}
+        for i, window in enumerate(self.windows):
+            leaving = self.buffer[(self.pos - window) % self.size]
+            full = self.rows >= window
+            left_missing = full & np.isnan(leaving)
+            self.sums[i] -= np.where(full & ~left_missing, leaving, 0.0)
+            self.nans[i] -= left_missing
+            self.sums[i] += np.where(missing, 0.0, closes)
+            self.nans[i] += missing
+        self.buffer[self.pos] = closes
+        self.pos = (self.pos + 1) % self.size
+        self.rows = np.minimum(self.rows + 1, self.size)
+        if self.pos == 0:
+            self.resum()
+        for i, window in enumerate(self.windows):
+            defined = (self.rows >= window) & (self.nans[i] == 0)
+            if members is not None:
+                defined &= members
+            with np.errstate(invalid="ignore"):
+                above = defined & (closes > self.sums[i].astype(np.float32) / np.float32(window))
+            counts[window] = int(above.sum())
+            totals[window] = int(defined.sum())
+        self.last_date = pd.Timestamp(date)
+        return self.last_date, counts, totals
+
+    def resum(self):
+        """
+        Recomputes the running sums from the buffer so they cannot drift.
+        """
+        for i, window in enumerate(self.windows):
+            idx = [(self.pos - k) % self.size for k in range(1, window + 1)]
+            self.sums[i] = np.nansum(self.buffer[idx], axis=0)
+
+    def select(self, tickers):
+        """
+        State restricted to `tickers` (all of which must be tracked).
+        """
+        cols = [self.tickers.index(t) for t in tickers]
+        state = BreadthState(tickers, self.windows)
+        state.buffer, state.sums, state.nans = self.buffer[:, cols], self.sums[:, cols], self.nans[:, cols]
+        state.rows, state.pos, state.last_date = self.rows[cols], self.pos, self.last_date
+        return state
+
+    def merge(self, other):
+        """
+        Adds the tickers of another state that is at the same date and buffer position.
+        """
+        self.tickers += other.tickers
+        self.buffer = np.hstack([self.buffer, other.buffer])
+        self.sums = np.hstack([self.sums, other.sums])
+        self.nans = np.hstack([self.nans, other.nans])
+        self.rows = np.concatenate([self.rows, other.rows])
+
+    def to_dict(self):
+        return {'version': STATE_VERSION, 'tickers': self.tickers, 'windows': list(self.windows), 'pos': self.pos,
+                'last_date': str(self.last_date.date()) if self.last_date is not None else None,
+                'buffer': self.buffer.tolist(), 'rows': self.rows.tolist()}
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get('version') != STATE_VERSION:
+            raise ValueError("state was written by an older version")
+        state = cls(data['tickers'], data['windows'])
+        state.buffer = np.array(data['buffer'], dtype=float).reshape(state.size, len(state.tickers))
+        state.rows = np.array(data['rows'], dtype=int)
+        state.pos = data['pos']
+        state.last_date = pd.Timestamp(data['last_date']) if data['last_date'] else None
+        for i, window in enumerate(state.windows):
+            idx = [(state.pos - k) % state.size for k in range(1, window + 1)]
+            recent = state.buffer[idx]
+            recent_rows = np.arange(1, window + 1)[:, None] <= state.rows  # rows actually seen
+            state.nans[i] = (np.isnan(recent) & recent_rows).sum(axis=0)
+        state.resum()
+        return state
+
+
+def load_state(path=STATE_FILE):
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path) as f:
+            return BreadthState.from_dict(json.load(f))
+    except Exception as e:
+        print(f"Could not load breadth state from {path}, starting cold: {e}")
+        return None
+
+
+def save_state(state, path=STATE_FILE):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(state.to_dict(), f)
+    os.replace(tmp, path)
+
+
+def breadth_frame(rows, benchmark):
+    """
+    Breadth rows as the DataFrame main() plots: Above<N>% columns plus the benchmark close.
+    Each date's denominator is the number of members with a defined MA on that date.
+    """
+    if not rows:
+        return pd.DataFrame()
+    dates = [date for date, _, _ in rows]
+    df = pd.DataFrame({f"Above{w}%": [counts[w] / totals[w] * 100 if totals[w] else np.nan
+                                      for _, counts, totals in rows]
+                       for w in rows[0][1]}, index=pd.DatetimeIndex(dates, name="Date"))
+    df["SP500"] = benchmark.reindex(df.index).to_numpy()
+    return df
+
+
+def full_breadth(panel, tickers, windows=MA_WINDOWS, benchmark=BENCHMARK, membership=None):
+    """
+    Reference: recomputes breadth over the whole panel with the vectorized engine.
+    """
+    universe = tickers
+    if membership is not None:
+        universe = pd.DataFrame([[t in membership(d) for t in tickers] for d in panel.index],
+                                index=panel.index, columns=tickers)
+    df = compute_breadth(panel, {'universe': universe}, windows)['universe']
+    df["SP500"] = panel[benchmark]
+    return df
+
+
+def update_breadth(panel, tickers, state_path=STATE_FILE, breadth_path=BREADTH_FILE,
+                   windows=MA_WINDOWS, benchmark=BENCHMARK, readjusted=(), membership=None):
+    """
+    Brings the persisted breadth history up to the panel's last date, feeding only the new
+    rows through the incremental state. Tickers added to the universe (or re-adjusted) are
+    seeded from the panel; past rows keep the membership they were computed with.
+    `membership(date)` restricts each date to its point-in-time members (see constituents.py).
+    """
+    state = load_state(state_path)
+    history = pd.read_parquet(breadth_path) if os.path.exists(breadth_path) else None
+    cold = (state is None or history is None or state.windows != tuple(windows)
+            or state.last_date not in panel.index)
+    if cold:
+        print("Breadth: cold start over the full panel")
+        state, rows = BreadthState.seed(panel, tickers, windows, membership=membership)
+        history = breadth_frame(rows, panel[benchmark])
+    else:
+        keep = [t for t in state.tickers if t in tickers and t not in readjusted]
+        seed = [t for t in tickers if t not in keep]
+        state = state.select(keep)
+        if seed:
+            print(f"Breadth: seeding {len(seed)} tickers")
+            # The last max(windows) rows are all the state holds, so they are enough to seed.
+            past = panel[panel.index <= state.last_date].iloc[-state.size:]
+            seeded, _ = BreadthState.seed(past, seed, windows, end_pos=state.pos)
+            state.merge(seeded)
+        new = panel[panel.index > state.last_date]
+        rows = state.replay(new, membership)
+        history = pd.concat([history, breadth_frame(rows, panel[benchmark])])
+        print(f"Breadth: {len(rows)} new dates")
+
+    save_state(state, state_path)
+    history.to_parquet(breadth_path)
+    return history
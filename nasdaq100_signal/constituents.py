@@ -0,0 +1,112 @@
+import json
+import os
+import time
+import pandas as pd
+import requests
+from bs4 import BeautifulSoup
+
+# === CONFIGURATION ===
+SLICKCHARTS_URL = "https://www.slickcharts.com/nasdaq100"
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/120.0.0.0 Safari/537.36"
+    )
+}
+CONSTITUENTS_FILE = "nasdaq100_constituents.json"  # dated membership snapshots
+CONSTITUENTS_TTL = 24 * 60 * 60  # seconds before the list is scraped again
+REQUEST_TIMEOUT = 30  # seconds
+
+
+def scrape_slickcharts():
+    """
+    Current Nasdaq-100 symbols, read straight from the table cells in one parse.
+    """
+    resp = requests.get(SLICKCHARTS_URL, headers=HEADERS, timeout=REQUEST_TIMEOUT)
+    resp.raise_for_status()
+    table = BeautifulSoup(resp.text, "html.parser").find("table", {"class": "table"})
+    header = [th.get_text(strip=True) for th in table.find("thead").find_all("th")]
+    col = header.index("Symbol")
+    tickers = []
+    for tr in table.find("tbody").find_all("tr"):
+        cells = tr.find_all("td")
+        if len(cells) > col:
+            tickers.append(cells[col].get_text(strip=True))
+    if not tickers:
+        raise ValueError("No symbols found in the slickcharts table")
+    return tickers
+
+
+class Constituents:
+    """
+    Lazily loaded, disk-cached index membership. Every scrape that differs from the last
+    snapshot is stored under its date, so members_on(date) gives point-in-time membership
+    from the first snapshot onwards (earlier dates fall back to the first snapshot).
+    """
+
+    def __init__(self, path=CONSTITUENTS_FILE, ttl=CONSTITUENTS_TTL, scraper=scrape_slickcharts):
+        self.path = path
+        self.ttl = ttl
+        self.scraper = scraper
+        self.snapshots = None  # {date string: [tickers]}, loaded on first use
+        self.fetched_at = 0
+
+    def load(self):
+        self.snapshots = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path) as f:
+                    raw = json.load(f)
+                self.snapshots = raw['snapshots']
+                self.fetched_at = raw['fetched_at']
+            except Exception as e:
+                print(f"Could not load constituents from {self.path}: {e}")
+
+    def save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({'fetched_at': self.fetched_at, 'snapshots': self.snapshots}, f)
+        os.replace(tmp, self.path)
+
+    def refresh(self, force=False):
+        if self.snapshots is None:
+            self.load()
+        if not force and self.snapshots and time.time() - self.fetched_at < self.ttl:
+            return
+        try:
+            tickers = self.scraper()
+        except Exception as e:
+            if not self.snapshots:
+                raise
+            print(f"Could not scrape constituents, using the last snapshot: {e}")
+            return
+        latest = self.snapshots[max(self.snapshots)] if self.snapshots else None
+        if latest is None or sorted(latest) != sorted(tickers):
+            today = pd.Timestamp.now().strftime("%Y-%m-%d")
+            self.snapshots[today] = tickers
+            print(f"Constituents changed, snapshot {today} with {len(tickers)} tickers")
+        self.fetched_at = time.time()
+        self.save()
+
+    def current(self):
+        self.refresh()
+        return list(self.snapshots[max(self.snapshots)])
+
+    def members_on(self, date):
+        """
+        Members in effect on `date` (the latest snapshot at or before it).
+        """
+        self.refresh()
+        day = pd.Timestamp(date).strftime("%Y-%m-%d")
+        dated = [d for d in sorted(self.snapshots) if d <= day]
+        return set(self.snapshots[dated[-1] if dated else min(self.snapshots)])
+
+    def all_members(self):
+        """
+        Every ticker in any snapshot, current members first.
+        """
+        tickers = self.current()
+        for day in sorted(self.snapshots, reverse=True):
+            tickers += [t for t in self.snapshots[day] if t not in tickers]
+        return tickers
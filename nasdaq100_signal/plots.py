@@ -0,0 +1,32 @@
+import numpy as np
+import matplotlib.pyplot as plt
+import seaborn as sns
+
+sns.set()
+
+
+def breadth_chart(df, column, label, title):
+    """
+    S&P 500 line with the breadth column as bars (red above 85%, green below 20%).
+    """
+    fig, ax1 = plt.subplots(figsize=(20,10))
+
+    # S&P 500 line
+    ax1.plot(df.index, df["SP500"], color="black", label="S&P 500")
+    ax1.set_ylabel("S&P 500", color="black", fontsize=16)
+    ax1.tick_params(axis="y", labelcolor="black", labelsize=14)
+    ax1.tick_params(axis="x", labelsize=14)
+
+    # Breadth bars
+    colors = np.where(df[column] > 85, "red",
+             np.where(df[column] < 20, "green", "blue"))
+    ax2 = ax1.twinx()
+    ax2.bar(df.index, df[column], color=colors, alpha=0.6, label=label)
+    ax2.set_ylabel("Breadth (%)", color="blue", fontsize=16)
+    ax2.tick_params(axis="y", labelcolor="blue", labelsize=14)
+    ax2.set_ylim(0,100)
+
+    # Legend and title
+    fig.legend(loc="upper left", bbox_to_anchor=(0.1,0.9), fontsize=14)
+    ax2.set_title(title, fontsize=20)
+    return fig
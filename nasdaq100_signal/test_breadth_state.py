@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+import pytest
+from breadth_state import ClosePanel, full_breadth, update_breadth
+
+WINDOWS = (5, 20)
+BENCHMARK = "^GSPC"
+DATES = pd.bdate_range("2024-01-02", periods=120)
+
+
+def synthetic_panel(seed=0, tickers=("A", "B", "C", "D", "E", "F")):
+    rng = np.random.default_rng(seed)
+    panel = pd.DataFrame(50 * np.exp(np.cumsum(rng.normal(0, 0.02, (len(DATES), len(tickers))), axis=0)),
+                         index=DATES, columns=list(tickers))
+    panel.iloc[:30, panel.columns.get_loc("E")] = np.nan  # listed later
+    panel.iloc[60, panel.columns.get_loc("D")] = np.nan  # one missing close
+    panel[BENCHMARK] = 4000 * np.exp(np.cumsum(rng.normal(0, 0.01, len(DATES))))
+    return panel
+
+
+def assert_matches_full(history, panel, tickers, since=None):
+    expected = full_breadth(panel, tickers, WINDOWS, BENCHMARK)
+    if since is not None:
+        history, expected = history[history.index > since], expected[expected.index > since]
+    pd.testing.assert_frame_equal(history, expected[history.columns], check_names=False, check_freq=False)
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return {'state_path': str(tmp_path / "breadth_state.json"),
+            'breadth_path': str(tmp_path / "nasdaq100_breadth.parquet")}
+
+
+def test_cold_and_incremental_match_full(paths):
+    panel = synthetic_panel()
+    tickers = list("ABCDE")
+    history = update_breadth(panel.iloc[:70], tickers, windows=WINDOWS, benchmark=BENCHMARK, **paths)
+    assert_matches_full(history, panel.iloc[:70], tickers)
+    for end in (71, 72, 90, 120):
+        history = update_breadth(panel.iloc[:end], tickers, windows=WINDOWS, benchmark=BENCHMARK, **paths)
+        assert_matches_full(history, panel.iloc[:end], tickers)
+
+
+def test_new_and_readjusted_tickers(paths):
+    panel = synthetic_panel()
+    old, new = list("ABCDE"), list("ABCDEF")
+    update_breadth(panel.iloc[:80], old, windows=WINDOWS, benchmark=BENCHMARK, **paths)
+
+    # A new ticker is seeded from the panel; earlier rows keep the old membership
+    history = update_breadth(panel.iloc[:95], new, windows=WINDOWS, benchmark=BENCHMARK, **paths)
+    assert_matches_full(history[history.index <= DATES[79]], panel.iloc[:80], old)
+    assert_matches_full(history, panel.iloc[:95], new, since=DATES[79])
+
+    # A split re-adjusts B's whole history
+    adjusted = panel.copy()
+    adjusted["B"] /= 2
+    history = update_breadth(adjusted.iloc[:110], new, windows=WINDOWS, benchmark=BENCHMARK,
+                             readjusted={"B"}, **paths)
+    assert_matches_full(history, adjusted.iloc[:110], new, since=DATES[94])
+
+
+def test_membership_matches_full(paths):
+    panel = synthetic_panel()
+    tickers = list("ABCDEF")
+
+    def membership(date):
+        return set("ABCD") if date < DATES[85] else set("BCDEF")
+
+    history = update_breadth(panel.iloc[:60], tickers, windows=WINDOWS, benchmark=BENCHMARK,
+                             membership=membership, **paths)
+    history = update_breadth(panel, tickers, windows=WINDOWS, benchmark=BENCHMARK,
+                             membership=membership, **paths)
+    expected = full_breadth(panel, tickers, WINDOWS, BENCHMARK, membership)
+    pd.testing.assert_frame_equal(history, expected[history.columns], check_names=False, check_freq=False)
+
+
+def test_close_panel_refetches_a_failed_ticker(tmp_path):
+    source = synthetic_panel()[list("ABC")]
+    failing = set()
+
+    def fetcher(tickers, start, end):
+        block = source.loc[(source.index >= start) & (source.index < end), tickers].copy()
+        block[[t for t in tickers if t in failing]] = np.nan
+        return block.dropna(how="all")
+
+    panel = ClosePanel(str(tmp_path / "closes.parquet"), fetcher)
+    panel.update(list("ABC"), now=DATES[100])
+    failing.add("B")
+    stored = panel.update(list("ABC"), now=DATES[105])
+    assert stored["B"].isna().sum() == 5
+    failing.clear()
+    stored = panel.update(list("ABC"), now=DATES[110])
+    assert panel.readjusted == {"B"}
+    pd.testing.assert_frame_equal(stored[list("ABC")], source.loc[stored.index], check_freq=False)